@@ -1,4 +1,4 @@
-from .graph import create_agent_graph, run_agent
+from .graph import create_agent_graph, get_agent_graph, run_agent
 from .state import AgentState
 
 
@@ -1,8 +1,17 @@
+import asyncio
+from typing import Optional
 from langgraph.graph import StateGraph, END
 from .state import AgentState
 from .nodes import plan_node, generate_node, validate_node, hashtag_node, finalize_node
 
 
+# Overall deadline for one agent run (all nodes combined)
+AGENT_TIMEOUT_SECONDS = 60
+
+# Compiled graph is built once and reused across requests
+_agent_graph = None
+
+
 def create_agent_graph():
     """
     Create the LangGraph state graph for tweet generation agent.
@@ -26,21 +35,12 @@ def create_agent_graph():
     # Plan -> Generate
     workflow.add_edge("plan", "generate")
     
-    # Generate -> Validate
+    # Generate -> Validate and Hashtags (run in parallel)
     workflow.add_edge("generate", "validate")
+    workflow.add_edge("generate", "add_hashtags")
     
-    # Validate -> Hashtags (if valid) or END (if invalid)
-    workflow.add_conditional_edges(
-        "validate",
-        lambda state: "add_hashtags" if state.get("is_valid") else "end",
-        {
-            "add_hashtags": "add_hashtags",
-            "end": END
-        }
-    )
-    
-    # Hashtags -> Finalize
-    workflow.add_edge("add_hashtags", "finalize")
+    # Validate + Hashtags -> Finalize (waits for both branches)
+    workflow.add_edge(["validate", "add_hashtags"], "finalize")
     
     # Finalize -> END
     workflow.add_edge("finalize", END)
@@ -51,7 +51,20 @@ def create_agent_graph():
     return app
 
 
-async def run_agent(user_prompt: str, platform: str = "twitter", user_id: str = None) -> AgentState:
+def get_agent_graph():
+    """
+    Get or create the compiled agent graph (built once per process).
+    
+    Returns:
+        Shared compiled state graph
+    """
+    global _agent_graph
+    if _agent_graph is None:
+        _agent_graph = create_agent_graph()
+    return _agent_graph
+
+
+async def run_agent(user_prompt: str, platform: str = "twitter", user_id: Optional[str] = None) -> dict:
     """
     Run the tweet generation agent with RAG context.
     
@@ -61,28 +74,28 @@ async def run_agent(user_prompt: str, platform: str = "twitter", user_id: str =
         user_id: User's UUID (for RAG context, optional)
         
     Returns:
-        Final agent state with generated tweet
+        Final agent state values (dict keyed by AgentState field) with generated tweet
     """
-    # Create the agent graph
-    app = create_agent_graph()
+    # Reuse the compiled agent graph
+    app = get_agent_graph()
     
     # Initialize state
-    initial_state: AgentState = {
-        "user_prompt": user_prompt,
-        "platform": platform,
-        "user_id": user_id,
-        "rag_context": None,
-        "tweet_content": "",
-        "hashtags": [],
-        "final_content": "",
-        "char_count": 0,
-        "is_valid": False,
-        "error": None,
-        "step": "start"
-    }
+    initial_state = AgentState(
+        user_prompt=user_prompt,
+        platform=platform,
+        user_id=user_id
+    )
     
-    # Run the agent
-    final_state = await app.ainvoke(initial_state)
+    # Run the agent (bounded so a stalled backend can't hang the request)
+    try:
+        async with asyncio.timeout(AGENT_TIMEOUT_SECONDS):
+            final_state = await app.ainvoke(initial_state)
+    except TimeoutError:
+        # Report the timeout on its own; partial node output could mask it
+        return {
+            "is_valid": False,
+            "error": f"Content generation timed out after {AGENT_TIMEOUT_SECONDS}s"
+        }
     
     return final_state
 
@@ -1,28 +1,84 @@
+import asyncio
+import logging
 from .state import AgentState
-from .tools import validate_tweet_length, combine_content_and_hashtags, get_char_count
+from .tools import validate_tweet_length, combine_content_and_hashtags
 from services.gemini_service import GeminiService
+from services.gemini_batcher import GeminiBatcher
 from services.rag_context_builder import get_rag_context_builder
+from services.semantic_cache import get_semantic_cache
 import os
 
+logger = logging.getLogger(__name__)
 
-# Initialize services lazily
-_gemini_service = None
-_rag_context_builder = None
 
-def get_gemini_service():
-    global _gemini_service
-    if _gemini_service is None:
-        _gemini_service = GeminiService()
-    return _gemini_service
+# Platform-specific requirements for RAG-enhanced prompts
+PLATFORM_REQUIREMENTS = {
+    "twitter": """Twitter Requirements:
+- Maximum 250 characters (leave room for hashtags)
+- Casual, conversational tone
+- Use emojis sparingly
+- Make it shareable and authentic""",
+    "linkedin": """LinkedIn Requirements:
+- Professional yet conversational
+- Maximum 1300 characters
+- Focus on insights and value
+- Use paragraphs for readability""",
+    "default": """Requirements:
+- Authentic and conversational
+- Provide value
+- Be genuine"""
+}
 
-def get_rag_builder():
-    global _rag_context_builder
-    if _rag_context_builder is None:
-        _rag_context_builder = get_rag_context_builder()
-    return _rag_context_builder
+# Static instructions appended to every RAG-enhanced prompt
+RAG_PROMPT_INSTRUCTIONS = """IMPORTANT: Generate content based on the SPECIFIC commits shown above. You MUST:
+1. Reference actual commit messages (e.g., "upgraded to google-genai 1.0.0", "refactored GeminiService")
+2. Mention specific version numbers, technologies, or features from the commits
+3. Talk about actual problems solved or features built (not generic "building" or "working on")
+4. Use the exact repository names and technical details shown above
+5. Make it sound like you're sharing what you ACTUALLY did, not what you're "diving into"
+6. MATCH THE USER'S WRITING STYLE shown above (length, tone, emoji usage)
+
+DO NOT use generic phrases like "been diving deep" or "building AI agents". Instead, say what you ACTUALLY built based on the commits above.
+Use the user's typical length, tone, and emoji style to make it authentic."""
 
 
-async def plan_node(state: AgentState) -> AgentState:
+# Upper bound on RAG context embedded in the prompt (~1k tokens)
+MAX_RAG_CONTEXT_CHARS = 4000
+
+
+def truncate_rag_context(context_text: str, max_chars: int = MAX_RAG_CONTEXT_CHARS) -> str:
+    """
+    Trim RAG context to the prompt budget.
+    
+    The builder emits the most relevant sections first, so keep the head and
+    cut at the last line break that fits to avoid half-written lines.
+    
+    Args:
+        context_text: Formatted RAG context
+        max_chars: Maximum number of characters to keep
+        
+    Returns:
+        Context text no longer than max_chars
+    """
+    if len(context_text) <= max_chars:
+        return context_text
+    
+    cut = context_text.rfind("\n", 0, max_chars)
+    return context_text[:cut if cut > 0 else max_chars]
+
+
+# Deadline for a single Gemini call; a stalled call fails its node instead of the run
+GEMINI_CALL_TIMEOUT_SECONDS = 25
+
+
+# Services are created once at import and shared by all nodes
+gemini_service = GeminiService()
+gemini_batcher = GeminiBatcher(gemini_service)
+rag_context_builder = get_rag_context_builder()
+semantic_cache = get_semantic_cache()
+
+
+async def plan_node(state: AgentState) -> dict:
     """
     Planning node - analyzes the user prompt and fetches RAG context.
     
@@ -30,45 +86,37 @@ async def plan_node(state: AgentState) -> AgentState:
         state: Current agent state
         
     Returns:
-        Updated state with RAG context
+        State update with RAG context
     """
-    print("🤔 Planning: Analyzing user prompt...")
-    
-    state["step"] = "planning"
-    state["error"] = None
+    logger.debug("🤔 Planning: Analyzing user prompt...")
     
     # Basic validation
-    if not state.get("user_prompt") or len(state["user_prompt"].strip()) == 0:
-        state["error"] = "User prompt is empty"
-        state["is_valid"] = False
-        return state
+    if not state.user_prompt or len(state.user_prompt.strip()) == 0:
+        return {"step": "planning", "error": "User prompt is empty", "is_valid": False}
     
     # Fetch RAG context if user_id is provided
-    user_id = state.get("user_id")
+    rag_context = ""
+    user_id = state.user_id
     if user_id:
         try:
-            print("🔍 Fetching relevant context from your work...")
-            rag_builder = get_rag_builder()
-            context_text = await rag_builder.get_context_for_tweet_generation(
+            logger.debug("🔍 Fetching relevant context from your work...")
+            rag_context = await rag_context_builder.get_context_for_tweet_generation(
                 user_id,
-                state["user_prompt"]
+                state.user_prompt
             )
-            state["rag_context"] = context_text
-            if context_text:
-                print(f"✅ Found relevant context ({len(context_text)} chars)")
+            if rag_context:
+                rag_context = truncate_rag_context(rag_context)
+                logger.debug("✅ Found relevant context (%d chars)", len(rag_context))
             else:
-                print("ℹ️  No additional context found")
+                logger.debug("ℹ️  No additional context found")
         except Exception as e:
-            print(f"⚠️  Warning: Could not fetch RAG context: {str(e)}")
-            state["rag_context"] = ""
-    else:
-        state["rag_context"] = ""
+            logger.warning("⚠️  Could not fetch RAG context: %s", e)
+            rag_context = ""
     
-    state["is_valid"] = True
-    return state
+    return {"step": "planning", "error": None, "rag_context": rag_context, "is_valid": True}
 
 
-async def generate_node(state: AgentState) -> AgentState:
+async def generate_node(state: AgentState) -> dict:
     """
     Generation node - calls Gemini to generate content with RAG context.
     
@@ -76,76 +124,41 @@ async def generate_node(state: AgentState) -> AgentState:
         state: Current agent state
         
     Returns:
-        Updated state with generated content
+        State update with generated content
     """
-    platform = state.get("platform", "twitter")
-    print(f"✍️  Generating: Creating {platform} content...")
-    
-    state["step"] = "generating"
+    platform = state.platform
+    logger.debug("✍️  Generating: Creating %s content...", platform)
     
     try:
         # Build enhanced prompt with RAG context
-        user_prompt = state["user_prompt"]
-        rag_context = state.get("rag_context", "")
-        
-        gemini_service = get_gemini_service()
+        user_prompt = state.user_prompt
+        rag_context = state.rag_context or ""
         
+        # No prompt-level cache or coalescing here: "Regenerate" resends the
+        # same prompt, and different users sending it must not share a tweet
         # If we have RAG context, enhance the prompt and use raw mode
         if rag_context:
-            # Build platform-specific requirements
-            if platform == "twitter":
-                requirements = """Twitter Requirements:
-- Maximum 250 characters (leave room for hashtags)
-- Casual, conversational tone
-- Use emojis sparingly
-- Make it shareable and authentic"""
-            elif platform == "linkedin":
-                requirements = """LinkedIn Requirements:
-- Professional yet conversational
-- Maximum 1300 characters
-- Focus on insights and value
-- Use paragraphs for readability"""
-            else:
-                requirements = """Requirements:
-- Authentic and conversational
-- Provide value
-- Be genuine"""
+            requirements = PLATFORM_REQUIREMENTS.get(platform, PLATFORM_REQUIREMENTS["default"])
+            enhanced_prompt = f"{rag_context}\n\nUSER REQUEST: {user_prompt}\n\n{requirements}\n\n{RAG_PROMPT_INSTRUCTIONS}"
             
-            enhanced_prompt = f"""{rag_context}
-
-USER REQUEST: {user_prompt}
-
-{requirements}
-
-IMPORTANT: Generate content based on the SPECIFIC commits shown above. You MUST:
-1. Reference actual commit messages (e.g., "upgraded to google-genai 1.0.0", "refactored GeminiService")
-2. Mention specific version numbers, technologies, or features from the commits
-3. Talk about actual problems solved or features built (not generic "building" or "working on")
-4. Use the exact repository names and technical details shown above
-5. Make it sound like you're sharing what you ACTUALLY did, not what you're "diving into"
-6. MATCH THE USER'S WRITING STYLE shown above (length, tone, emoji usage)
-
-DO NOT use generic phrases like "been diving deep" or "building AI agents". Instead, say what you ACTUALLY built based on the commits above.
-Use the user's typical length, tone, and emoji style to make it authentic."""
-            
-            print(f"   📊 Using RAG context ({len(rag_context)} chars)")
-            tweet_content = await gemini_service.generate_tweet(enhanced_prompt, platform, use_raw_prompt=True)
+            logger.debug("   📊 Using RAG context (%d chars)", len(rag_context))
+            async with asyncio.timeout(GEMINI_CALL_TIMEOUT_SECONDS):
+                tweet_content = await gemini_service.generate_tweet(enhanced_prompt, platform, use_raw_prompt=True)
         else:
             # No RAG context, use standard template
-            print(f"   ℹ️  No RAG context available, using standard template")
-            tweet_content = await gemini_service.generate_tweet(user_prompt, platform, use_raw_prompt=False)
+            logger.debug("   ℹ️  No RAG context available, using standard template")
+            async with asyncio.timeout(GEMINI_CALL_TIMEOUT_SECONDS):
+                tweet_content = await gemini_service.generate_tweet(user_prompt, platform, use_raw_prompt=False)
         
-        state["tweet_content"] = tweet_content
-        state["is_valid"] = True
+        return {"step": "generating", "tweet_content": tweet_content, "is_valid": True}
         
+    except TimeoutError:
+        return {"step": "generating", "error": "Generation timed out", "is_valid": False}
     except Exception as e:
-        state["error"] = f"Generation failed: {str(e)}"
-        state["is_valid"] = False
-    
-    return state
+        return {"step": "generating", "error": f"Generation failed: {str(e)}", "is_valid": False}
 
 
-async def validate_node(state: AgentState) -> AgentState:
+async def validate_node(state: AgentState) -> dict:
     """
     Validation node - checks if generated content is valid.
     
@@ -153,23 +166,23 @@ async def validate_node(state: AgentState) -> AgentState:
         state: Current agent state
         
     Returns:
-        Updated state with validation result
+        State update with validation result
     """
-    print("✅ Validating: Checking tweet quality...")
-    
-    state["step"] = "validating"
+    logger.debug("✅ Validating: Checking tweet quality...")
     
-    # Validate tweet length
-    is_valid = validate_tweet_length(state.get("tweet_content", ""))
-    state["is_valid"] = is_valid
+    # Validate tweet length (non-empty and within 280 characters)
+    content = state.tweet_content
+    is_valid = bool(content and content.strip() and len(content) <= 280)
+    update = {"step": "validating", "is_valid": is_valid}
     
-    if not is_valid:
-        state["error"] = "Tweet content is invalid or too long"
+    # Keep an earlier error (e.g. a generation timeout) instead of masking it
+    if not is_valid and not state.error:
+        update["error"] = "Tweet content is invalid or too long"
     
-    return state
+    return update
 
 
-async def hashtag_node(state: AgentState) -> AgentState:
+async def hashtag_node(state: AgentState) -> dict:
     """
     Hashtag node - generates relevant hashtags.
     
@@ -177,28 +190,41 @@ async def hashtag_node(state: AgentState) -> AgentState:
         state: Current agent state
         
     Returns:
-        Updated state with hashtags
+        State update with hashtags
     """
-    platform = state.get("platform", "twitter")
-    print("🏷️  Hashtags: Generating relevant hashtags...")
+    platform = state.platform
+    tweet_content = state.tweet_content
     
-    state["step"] = "hashtags"
+    # Skip the Gemini call when validation is going to fail anyway
+    if not validate_tweet_length(tweet_content):
+        return {"hashtags": []}
+    
+    logger.debug("🏷️  Hashtags: Generating relevant hashtags...")
     
     try:
-        # Generate hashtags using Gemini with platform-specific prompts
-        gemini_service = get_gemini_service()
-        hashtags = await gemini_service.generate_hashtags(state["tweet_content"], platform)
-        state["hashtags"] = hashtags
+        # Hashtags depend only on the content, so an exact-key cache is enough
+        cache_bucket = semantic_cache.make_bucket("hashtags", platform, tweet_content)
+        cached_hashtags = semantic_cache.lookup(cache_bucket)
+        
+        if cached_hashtags is not None:
+            return {"hashtags": list(cached_hashtags)}
+        
+        # Generate hashtags using Gemini (batched) with platform-specific prompts
+        async with asyncio.timeout(GEMINI_CALL_TIMEOUT_SECONDS):
+            hashtags = await gemini_batcher.generate_hashtags(tweet_content, platform)
+        
+        if hashtags:
+            semantic_cache.store(cache_bucket, list(hashtags))
+        
+        return {"hashtags": hashtags}
         
     except Exception as e:
-        print(f"Hashtag generation failed: {str(e)}")
+        logger.warning("Hashtag generation failed: %s", e)
         # Continue without hashtags
-        state["hashtags"] = []
-    
-    return state
+        return {"hashtags": []}
 
 
-async def finalize_node(state: AgentState) -> AgentState:
+async def finalize_node(state: AgentState) -> dict:
     """
     Finalization node - combines content with hashtags.
     
@@ -206,28 +232,31 @@ async def finalize_node(state: AgentState) -> AgentState:
         state: Current agent state
         
     Returns:
-        Final state with combined content
+        State update with combined content
     """
-    print("🎯 Finalizing: Preparing final tweet...")
+    # Validation failed in the parallel branch, keep its error
+    if not state.is_valid:
+        return {}
     
-    state["step"] = "finalizing"
+    logger.debug("🎯 Finalizing: Preparing final tweet...")
     
-    # Combine content with hashtags
-    final_content = combine_content_and_hashtags(
-        state["tweet_content"],
-        state.get("hashtags", [])
-    )
+    # Combine content with hashtags (trims the copy to what fits)
+    hashtags = list(state.hashtags)
+    final_content = combine_content_and_hashtags(state.tweet_content, hashtags)
     
-    state["final_content"] = final_content
-    state["char_count"] = get_char_count(final_content)
+    char_count = len(final_content)
+    update = {
+        "step": "finalizing",
+        "hashtags": hashtags,
+        "final_content": final_content,
+        "char_count": char_count,
+        # Final validation
+        "is_valid": validate_tweet_length(final_content)
+    }
     
-    # Final validation
-    state["is_valid"] = validate_tweet_length(final_content)
+    if not update["is_valid"]:
+        update["error"] = "Final content exceeds character limit"
     
-    if not state["is_valid"]:
-        state["error"] = "Final content exceeds character limit"
+    logger.debug("✨ Done! Character count: %d/280", char_count)
     
-    print(f"✨ Done! Character count: {state['char_count']}/280")
-    
-    return state
-
+    return update
@@ -1,18 +1,18 @@
-from typing import TypedDict, List, Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 
-class AgentState(TypedDict):
+@dataclass(slots=True)
+class AgentState:
     """State schema for the tweet generation agent."""
-    user_prompt: str                # Original user input
-    platform: str                   # Target platform (twitter, linkedin, reddit)
-    user_id: Optional[str]          # User's UUID (for RAG context)
-    rag_context: Optional[str]      # RAG context from semantic search
-    tweet_content: str              # Generated tweet content
-    hashtags: List[str]             # Suggested hashtags
-    final_content: str              # Tweet + hashtags combined
-    char_count: int                 # Character count
-    is_valid: bool                  # Validation status
-    error: Optional[str]            # Error message if any
-    step: str                       # Current step name
-
-
+    user_prompt: str = ""                                   # Original user input
+    platform: str = "twitter"                               # Target platform (twitter, linkedin, reddit)
+    user_id: Optional[str] = None                           # User's UUID (for RAG context)
+    rag_context: Optional[str] = None                       # RAG context from semantic search
+    tweet_content: str = ""                                 # Generated tweet content
+    hashtags: List[str] = field(default_factory=list)       # Suggested hashtags
+    final_content: str = ""                                 # Tweet + hashtags combined
+    char_count: int = 0                                     # Character count
+    is_valid: bool = False                                  # Validation status
+    error: Optional[str] = None                             # Error message if any
+    step: str = "start"                                     # Current step name
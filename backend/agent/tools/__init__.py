@@ -2,6 +2,8 @@
 Agent tools package
 """
 
+from bisect import bisect_right
+from itertools import accumulate
 from typing import List
 
 from .twitter_tool import (
@@ -51,38 +53,24 @@ def combine_content_and_hashtags(content: str, hashtags: List[str]) -> str:
     
     # Ensure it's within 280 characters
     if len(combined) > 280:
-        # Try without newlines
-        combined = f"{content} {hashtags_str}"
+        # Without newlines, each hashtag costs its length plus one separator.
+        # Find how many fit from the cumulative lengths instead of re-joining.
+        cumulative = list(accumulate(len(tag) + 1 for tag in hashtags))
+        keep = bisect_right(cumulative, 280 - len(content))
         
-        # If still too long, remove hashtags one by one
-        while len(combined) > 280 and hashtags:
-            hashtags.pop()
-            hashtags_str = " ".join(hashtags)
-            combined = f"{content} {hashtags_str}" if hashtags else content
+        # Drop hashtags that didn't fit (callers rely on the list being trimmed)
+        del hashtags[keep:]
+        combined = f"{content} {' '.join(hashtags)}" if hashtags else content
     
     return combined
 
 
-def get_char_count(content: str) -> int:
-    """
-    Get character count of content.
-    
-    Args:
-        content: Content to count
-        
-    Returns:
-        Character count
-    """
-    return len(content)
-
-
 __all__ = [
     "get_twitter_constraints",
     "get_twitter_prompt_context",
     "validate_twitter_content",
     "optimize_twitter_content",
     "validate_tweet_length",
-    "combine_content_and_hashtags",
-    "get_char_count"
+    "combine_content_and_hashtags"
 ]
 
@@ -2,6 +2,8 @@
 Twitter-specific tools and utilities for content generation
 """
 
+from bisect import bisect_right
+from itertools import accumulate
 from typing import Dict, Any
 
 
@@ -66,10 +68,12 @@ def validate_twitter_content(content: str) -> tuple[bool, str]:
     if not content:
         return False, "Content is empty"
     
-    if len(content) > TWITTER_MAX_LENGTH:
-        return False, f"Content exceeds {TWITTER_MAX_LENGTH} characters (current: {len(content)})"
+    # len() is O(1), so the hashtag count below is the only pass over the text
+    length = len(content)
+    if length > TWITTER_MAX_LENGTH:
+        return False, f"Content exceeds {TWITTER_MAX_LENGTH} characters (current: {length})"
     
-    # Count hashtags
+    # Count hashtags (single C-level scan)
     hashtag_count = content.count('#')
     if hashtag_count > TWITTER_HASHTAG_LIMIT:
         return False, f"Too many hashtags ({hashtag_count}). Maximum is {TWITTER_HASHTAG_LIMIT}"
@@ -102,14 +106,16 @@ def optimize_twitter_content(content: str, hashtags: list[str]) -> str:
     if len(combined) > TWITTER_MAX_LENGTH:
         # Try with fewer hashtags
         if limited_hashtags:
-            # Remove hashtags one by one until it fits
-            while limited_hashtags and len(combined) > TWITTER_MAX_LENGTH:
-                limited_hashtags.pop()
-                if limited_hashtags:
-                    hashtag_string = " ".join(f"#{tag.strip('#')}" for tag in limited_hashtags)
-                    combined = f"{content}\n\n{hashtag_string}"
-                else:
-                    combined = content
+            # Keep as many hashtags as fit, based on cumulative lengths
+            # ("\n\n" before the first tag, one space before each other tag)
+            tags = [f"#{tag.strip('#')}" for tag in limited_hashtags]
+            cumulative = list(accumulate(len(tag) + 1 for tag in tags))
+            keep = bisect_right(cumulative, TWITTER_MAX_LENGTH - len(content) - 1)
+            
+            if keep:
+                combined = f"{content}\n\n{' '.join(tags[:keep])}"
+            else:
+                combined = content
         
         # If still too long, truncate content
         if len(combined) > TWITTER_MAX_LENGTH:
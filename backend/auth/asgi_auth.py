@@ -0,0 +1,61 @@
+"""
+Pure ASGI JWT authentication middleware and dependency
+"""
+
+from fastapi import HTTPException, Request, status
+from services.supabase_service import supabase_service
+
+
+class JWTAuthMiddleware:
+    """
+    Verify the Bearer token once per request and stash the claims in scope.
+
+    Written as raw ASGI (not BaseHTTPMiddleware) so it adds no task group or
+    Request/Response objects per request. Requests without a valid token pass
+    through unchanged; endpoints that need a user enforce it via current_user_id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            user = None
+            auth_error = None
+
+            # Headers are raw (name, value) byte pairs with lowercase names;
+            # compare the scheme as bytes and only decode the token itself.
+            # Verification stays on the event loop: Supabase tokens are HS256
+            # (an HMAC, microseconds) and usually a cache hit, so a threadpool
+            # hop would cost more than it saves.
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    if value[:7] == b"Bearer ":
+                        try:
+                            user = supabase_service.verify_jwt_token(value[7:].decode("ascii"))
+                        except UnicodeDecodeError:
+                            auth_error = "Invalid token"
+                        except HTTPException as e:
+                            auth_error = e.detail
+                    break
+
+            state = scope.setdefault("state", {})
+            state["user"] = user
+            state["auth_error"] = auth_error
+
+        await self.app(scope, receive, send)
+
+
+def current_user_id(request: Request) -> str:
+    """
+    Return the authenticated user's ID or raise 401.
+    """
+    state = request.scope.get("state", {})
+    user = state.get("user")
+    if not user:
+        auth_error = state.get("auth_error")
+        if auth_error:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=auth_error)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+    return user["sub"]
@@ -40,7 +40,7 @@ async def get_current_user_with_profile(credentials: HTTPAuthorizationCredential
     Verify JWT token and return user with profile data
     """
     user_id = await get_current_user(credentials)
-    profile = supabase_service.get_user_profile(user_id)
+    profile = await supabase_service.get_user_profile(user_id)
     
     return {
         "user_id": user_id,
@@ -11,9 +11,9 @@ import sys
 # Load environment variables
 load_dotenv()
 
-def check_env_var(name, required=True):
-    """Check if an environment variable is set"""
-    value = os.getenv(name)
+def check_env_var(env, name, required=True):
+    """Check if an environment variable is set in the env snapshot"""
+    value = env.get(name)
     if not value:
         if required:
             print(f"❌ MISSING: {name}")
@@ -38,34 +38,37 @@ def main():
     
     all_good = True
     
+    # Snapshot the environment once and validate from it
+    env = dict(os.environ)
+    
     print("📋 Checking Supabase Configuration...")
     print("-" * 60)
-    all_good &= check_env_var("SUPABASE_URL")
-    all_good &= check_env_var("SUPABASE_SERVICE_KEY")
-    all_good &= check_env_var("SUPABASE_JWT_SECRET")
+    all_good &= check_env_var(env, "SUPABASE_URL")
+    all_good &= check_env_var(env, "SUPABASE_SERVICE_KEY")
+    all_good &= check_env_var(env, "SUPABASE_JWT_SECRET")
     print()
     
     print("🐦 Checking Twitter OAuth 2.0 Configuration...")
     print("-" * 60)
-    all_good &= check_env_var("TWITTER_CLIENT_ID")
-    all_good &= check_env_var("TWITTER_CLIENT_SECRET")
-    all_good &= check_env_var("TWITTER_REDIRECT_URI")
+    all_good &= check_env_var(env, "TWITTER_CLIENT_ID")
+    all_good &= check_env_var(env, "TWITTER_CLIENT_SECRET")
+    all_good &= check_env_var(env, "TWITTER_REDIRECT_URI")
     print()
     
     print("🤖 Checking Gemini AI Configuration...")
     print("-" * 60)
-    all_good &= check_env_var("GEMINI_API_KEY")
+    all_good &= check_env_var(env, "GEMINI_API_KEY")
     print()
     
     print("⚙️  Checking Server Configuration...")
     print("-" * 60)
-    check_env_var("CORS_ORIGINS", required=False)
-    check_env_var("FRONTEND_URL", required=False)
-    check_env_var("PORT", required=False)
+    check_env_var(env, "CORS_ORIGINS", required=False)
+    check_env_var(env, "FRONTEND_URL", required=False)
+    check_env_var(env, "PORT", required=False)
     print()
     
     # Validate Twitter redirect URI format
-    redirect_uri = os.getenv("TWITTER_REDIRECT_URI")
+    redirect_uri = env.get("TWITTER_REDIRECT_URI")
     if redirect_uri:
         print("🔗 Validating Redirect URI...")
         print("-" * 60)
@@ -81,7 +84,7 @@ def main():
         print()
     
     # Check Twitter Client ID format
-    client_id = os.getenv("TWITTER_CLIENT_ID")
+    client_id = env.get("TWITTER_CLIENT_ID")
     if client_id:
         print("🔑 Validating Twitter Client ID...")
         print("-" * 60)
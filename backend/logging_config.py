@@ -0,0 +1,47 @@
+"""
+Logging configuration - write log records from a background thread.
+
+Stream handlers block the caller while they write and flush. Records are
+instead put on a queue by a QueueHandler and written to stderr by a
+QueueListener thread, so logging from async code never blocks the event loop.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: Optional[str] = None) -> None:
+    """
+    Configure the root logger to log through a background queue listener.
+    
+    Safe to call more than once; only the first call installs handlers.
+    
+    Args:
+        level: Log level name (default: LOG_LEVEL env var or INFO)
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(level)
+    
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -3,12 +3,26 @@ from dotenv import load_dotenv
 # Load environment variables FIRST before any other imports
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, Header, Query
+from logging_config import setup_logging
+
+# Log through a background thread so handlers never block the event loop
+setup_logging()
+
+from fastapi import FastAPI, HTTPException, Depends, Query, BackgroundTasks, Request, Response
+from contextlib import asynccontextmanager
+import asyncio
+import bisect
+import hashlib
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse, PlainTextResponse
+from starlette.routing import Route
+import logging
+import orjson
 import os
 import secrets
+import time
 from typing import Optional
+from urllib.parse import quote
 
 from models.schemas import (
     GenerateRequest,
@@ -16,58 +30,106 @@ from models.schemas import (
     PostRequest,
     PostResponse,
     HistoryResponse,
-    PostHistoryItem,
     TweetHistoryItem
 )
-from auth.supabase_auth import get_current_user
+from auth.asgi_auth import JWTAuthMiddleware, current_user_id
+from metrics import RouteTimingMiddleware, render_prometheus
 from agent.graph import run_agent
 from storage.tweet_storage import TweetStorage
 from services.social.twitter_service import TwitterOAuthService
 from services.social.github_service import GitHubOAuthService
 from services.supabase_service import supabase_service
-from services.github_data_service import GitHubDataService
+from services.github_data_service import GitHubDataService, ACTIVITY_LIST_COLUMNS
 from services.twitter_data_service import twitter_data_service
 from services.twitter_analysis_service import twitter_analysis_service
 from services.context_service import ContextService
 from services.embedding_service import get_embedding_service
 from services.embedding_job_service import get_embedding_job_service
+from services.embedding_batcher import get_embedding_batcher
 from services.subscription_service import get_subscription_service
 from services.razorpay_service import get_razorpay_service
+from services.rag_context_builder import get_rag_context_builder
+from services.oauth_state_store import get_oauth_state_store
+from services.token_refresh_service import get_token_refresh_service
+from services.http_client import get_http_client, close_http_client
+
+logger = logging.getLogger(__name__)
 
 # Validate Razorpay configuration at startup
 try:
     razorpay_service = get_razorpay_service()
 except ValueError as e:
-    print(f"❌ Razorpay configuration error: {e}")
-    print("Please set RAZORPAY_KEY_ID and RAZORPAY_KEY_SECRET in your .env file")
+    logger.error("❌ Razorpay configuration error: %s", e)
+    logger.error("Please set RAZORPAY_KEY_ID and RAZORPAY_KEY_SECRET in your .env file")
     raise
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background jobs for the lifetime of the app."""
+    # Shared outbound HTTP client (also used by the Twitter/GitHub services)
+    app.state.http = get_http_client()
+    
+    # Refresh Twitter tokens ahead of expiry so posting rarely refreshes inline
+    token_refresh_task = asyncio.create_task(token_refresh_service.run_forever())
+    try:
+        yield
+    finally:
+        token_refresh_task.cancel()
+        await close_http_client()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Mataroo.com API",
     description="AI-powered social media content generator with agentic workflows",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Serialize responses with orjson (straight to bytes, much faster than json.dumps)
+    default_response_class=ORJSONResponse
 )
 
-# Configure CORS
-cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+# Frontend redirect targets for OAuth callbacks (resolved once at startup)
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+FRONTEND_CONNECTED_URLS = {
+    "twitter": f"{FRONTEND_URL}/settings?connected=twitter",
+    "github": f"{FRONTEND_URL}/settings?connected=github"
+}
+FRONTEND_ERROR_URL = f"{FRONTEND_URL}/settings?error="
+
+# Returned for unexpected 500s; the details go to the log, not the client
+INTERNAL_ERROR_DETAIL = "Internal server error"
+
+# Shared secret for /internal/metrics (the endpoint is disabled when unset)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Verify Bearer tokens once per request (pure ASGI, see auth/asgi_auth.py)
+app.add_middleware(JWTAuthMiddleware)
+
+# Time every request by route (inside CORS, so auth time is included)
+app.add_middleware(RouteTimingMiddleware)
+
+# Configure CORS (added last so it is outermost and answers preflights
+# before auth runs). Only the methods/headers the API actually uses.
+cors_origins = frozenset(os.getenv("CORS_ORIGINS", "http://localhost:3000").split(","))
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 # Initialize services
 tweet_storage = TweetStorage()
 twitter_oauth = TwitterOAuthService()
+token_refresh_service = get_token_refresh_service(twitter_oauth)
 github_oauth = GitHubOAuthService()
 github_data_service = GitHubDataService()
 context_service = ContextService()
+rag_context_builder = get_rag_context_builder()
 
-# Store OAuth states temporarily (in production, use Redis or database)
-oauth_states = {}
+# OAuth states live in Redis so login and callback can hit different workers
+oauth_state_store = get_oauth_state_store()
 
 
 @app.get("/")
@@ -80,37 +142,60 @@ async def root():
     }
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+class HealthApp:
+    """
+    Health check endpoint as a raw ASGI app.
+    
+    Liveness probes hit this constantly, so it skips request/response objects,
+    dependency injection and JSON encoding and just sends precomputed bytes.
+    """
+    
+    BODY = b'{"status":"healthy"}'
+    HEADERS = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(BODY)).encode())
+    ]
+    
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": self.HEADERS})
+        await send({"type": "http.response.body", "body": self.BODY})
+
+
+# Health check endpoint (first route, so it matches before anything else)
+app.router.routes.insert(0, Route("/health", endpoint=HealthApp()))
+
+
+@app.get("/internal/metrics", include_in_schema=False)
+async def internal_metrics(request: Request):
+    """
+    Route and span latency stats for this worker in Prometheus text format.
+    
+    Requires the X-Metrics-Token header to match METRICS_TOKEN.
+    """
+    token = request.headers.get("x-metrics-token", "")
+    if not METRICS_TOKEN or not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 
 @app.post("/api/generate", response_model=GenerateResponse)
 async def generate_content(
     request: GenerateRequest,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Generate content using the agentic AI workflow.
     
     Args:
         request: GenerateRequest with user prompt and platform
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         
     Returns:
         GenerateResponse with generated content data
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n📝 User {user_id} - Received prompt for {request.platform}: {request.prompt}")
+        logger.info("📝 User %s - Received prompt for %s: %s", user_id, request.platform, request.prompt)
         
         # Run the agent with platform parameter and user_id for RAG context
         final_state = await run_agent(request.prompt, request.platform, user_id)
@@ -137,40 +222,101 @@ async def generate_content(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error in generate endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error in generate endpoint")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
+
+
+async def _get_valid_twitter_token(user_id: str, account: dict) -> str:
+    """
+    Return a usable access token for the user's Twitter account.
+    
+    Tokens are normally refreshed ahead of expiry by TokenRefreshService;
+    an already expired one is refreshed inline through the same per-user lock.
+    
+    Args:
+        user_id: Authenticated user ID
+        account: User's connected Twitter account row
+        
+    Returns:
+        Access token
+    """
+    access_token = account["access_token"]
+    # expires_at_epoch is stored next to expires_at whenever tokens are written
+    expires_at_epoch = account.get("expires_at_epoch")
+    if expires_at_epoch and time.time() >= expires_at_epoch:
+        # Expired: the background refresher fell behind, refresh inline
+        logger.info("🔄 Token expired, refreshing for user %s...", user_id)
+        try:
+            # Shielded so a client disconnect doesn't cancel a shared refresh
+            access_token = await asyncio.shield(
+                token_refresh_service.refresh_twitter_token(user_id, account.get("expires_at"))
+            )
+        except Exception:
+            raise HTTPException(
+                status_code=401,
+                detail="Your Twitter session has expired. Please reconnect your account."
+            )
+    
+    return access_token
+
+
+async def _post_twitter(user_id: str, account: dict, content: str) -> dict:
+    """
+    Post a tweet with the user's connected account, refreshing the token if needed.
+    
+    Args:
+        user_id: Authenticated user ID
+        account: User's connected Twitter account row
+        content: Tweet text
+        
+    Returns:
+        Twitter post result (tweet_id, post_id, url)
+    """
+    access_token = await _get_valid_twitter_token(user_id, account)
+    return await twitter_oauth.post_tweet(content, access_token)
+
+
+def _post_not_implemented(platform_name: str):
+    """Build a poster for a platform that isn't supported yet (501)."""
+    async def poster(user_id: str, account: dict, content: str) -> dict:
+        raise HTTPException(status_code=501, detail=f"{platform_name} posting not yet implemented")
+    return poster
+
+
+# Posting handler per platform
+PLATFORM_POSTERS = {
+    "twitter": _post_twitter,
+    "linkedin": _post_not_implemented("LinkedIn"),  # Phase 2
+    "reddit": _post_not_implemented("Reddit")       # Phase 3
+}
 
 
 @app.post("/api/post", response_model=PostResponse)
 async def post_content(
     request: PostRequest,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Post the generated content to the specified platform using user's connected account.
     
     Args:
         request: PostRequest with content, platform, and hashtags
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         
     Returns:
         PostResponse with post URL
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
+        logger.info("🚀 User %s - Posting to %s: %s...", user_id, request.platform, request.content[:50])
         
-        print(f"\n🚀 User {user_id} - Posting to {request.platform}: {request.content[:50]}...")
-        
-        # Check subscription limit before posting
+        # Check subscription limit and load the connected account concurrently
+        # (the subscription service is still sync, so it runs in a thread)
         subscription_service = get_subscription_service()
-        can_post, message = subscription_service.can_user_post(user_id)
+        (can_post, message), account = await asyncio.gather(
+            asyncio.to_thread(subscription_service.can_user_post, user_id),
+            supabase_service.get_platform_connection(user_id, request.platform)
+        )
         
         if not can_post:
             raise HTTPException(
@@ -178,9 +324,6 @@ async def post_content(
                 detail=message
             )
         
-        # Get user's connected account for this platform
-        account = supabase_service.get_platform_connection(user_id, request.platform)
-        
         if not account:
             raise HTTPException(
                 status_code=400,
@@ -193,71 +336,17 @@ async def post_content(
                 detail=f"Your {request.platform} account is not active. Please reconnect."
             )
         
-        # Debug: Check what fields we have
-        print(f"📊 Account data fields: {list(account.keys())}")
-        print(f"📊 Has expires_at: {account.get('expires_at') is not None}")
-        print(f"📊 Has refresh_token: {account.get('refresh_token') is not None}")
+        # Debug: Check what fields we have (lazy %s args, formatted only at DEBUG)
+        logger.debug("📊 Account data fields: %s", account.keys())
+        logger.debug("📊 Has expires_at: %s", account.get("expires_at") is not None)
+        logger.debug("📊 Has refresh_token: %s", account.get("refresh_token") is not None)
         
         # Post to platform using user's tokens
-        result = None
-        if request.platform == "twitter":
-            # Use Twitter OAuth service with user's access token
-            twitter_oauth = TwitterOAuthService()
-            
-            # Check if token is expired and refresh if needed
-            access_token = account["access_token"]
-            if account.get("expires_at"):
-                from datetime import datetime, timezone
-                
-                # Parse the expires_at timestamp
-                expires_at_str = account["expires_at"]
-                if isinstance(expires_at_str, str):
-                    # Handle ISO format with or without timezone
-                    if expires_at_str.endswith('Z'):
-                        expires_at_str = expires_at_str.replace('Z', '+00:00')
-                    expires_at = datetime.fromisoformat(expires_at_str)
-                    # Ensure it's timezone-aware
-                    if expires_at.tzinfo is None:
-                        expires_at = expires_at.replace(tzinfo=timezone.utc)
-                else:
-                    expires_at = expires_at_str
-                
-                if twitter_oauth.is_token_expired(expires_at):
-                    print(f"🔄 Token expired, refreshing for user {user_id}...")
-                    try:
-                        # Refresh the token
-                        token_response = await twitter_oauth.refresh_access_token(account["refresh_token"])
-                        
-                        # Update the access token
-                        access_token = token_response["access_token"]
-                        
-                        # Update tokens in database
-                        new_expires_at = twitter_oauth.calculate_token_expiry(token_response.get("expires_in", 7200))
-                        supabase_service.update_platform_tokens(
-                            user_id,
-                            request.platform,
-                            access_token,
-                            token_response.get("refresh_token", account["refresh_token"]),
-                            new_expires_at
-                        )
-                        print(f"✅ Token refreshed successfully for user {user_id}")
-                    except Exception as e:
-                        print(f"❌ Failed to refresh token: {str(e)}")
-                        raise HTTPException(
-                            status_code=401,
-                            detail="Your session has expired. Please reconnect your account."
-                        )
-            
-            result = await twitter_oauth.post_tweet(
-                request.content,
-                access_token
-            )
-        elif request.platform == "linkedin":
-            # LinkedIn posting will be implemented in Phase 2
-            raise HTTPException(status_code=501, detail="LinkedIn posting not yet implemented")
-        elif request.platform == "reddit":
-            # Reddit posting will be implemented in Phase 3
-            raise HTTPException(status_code=501, detail="Reddit posting not yet implemented")
+        poster = PLATFORM_POSTERS.get(request.platform)
+        if poster is None:
+            raise HTTPException(status_code=400, detail=f"Unknown platform: {request.platform}")
+        
+        result = await poster(user_id, account, request.content)
         
         if not result:
             raise HTTPException(status_code=500, detail="Failed to post content")
@@ -274,12 +363,14 @@ async def post_content(
             "status": "posted"
         }
         
-        post_id = supabase_service.save_post(post_data)
-        
-        # Increment post count after successful post
-        subscription_service.increment_post_count(user_id)
+        # Save the post and increment post count concurrently; the count must
+        # land before responding or a quick follow-up post slips past the limit
+        await asyncio.gather(
+            supabase_service.save_post(post_data),
+            asyncio.to_thread(subscription_service.increment_post_count, user_id)
+        )
         
-        print(f"✅ Posted successfully to {request.platform}: {result.get('url')}")
+        logger.info("✅ Posted successfully to %s: %s", request.platform, result.get('url'))
         
         return PostResponse(
             success=True,
@@ -289,14 +380,31 @@ async def post_content(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error posting content: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error posting content")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
+
+
+def _conditional_json(request: Request, content: dict) -> Response:
+    """
+    Serialize content with an ETag, answering 304 if the client already has it.
+    
+    The dashboard polls history, tweets and GitHub status; an unchanged body
+    costs the client nothing to re-download or re-render.
+    """
+    body = orjson.dumps(content)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/history", response_model=HistoryResponse)
 async def get_post_history(
-    authorization: Optional[str] = Header(None),
+    request: Request,
+    user_id: str = Depends(current_user_id),
     platform: Optional[str] = None,
     limit: int = 50
 ):
@@ -304,7 +412,7 @@ async def get_post_history(
     Get user's post history from Supabase.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         platform: Optional filter by platform
         limit: Maximum number of posts to return
         
@@ -312,74 +420,47 @@ async def get_post_history(
         HistoryResponse with list of posts
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get posts from Supabase
-        posts_data = supabase_service.get_user_posts(user_id, platform, limit)
-        
-        # Convert to PostHistoryItem models
-        posts = []
-        for post in posts_data:
-            posts.append(PostHistoryItem(
-                id=post.get("id"),
-                platform=post.get("platform"),
-                user_prompt=post.get("user_prompt", ""),
-                generated_content=post.get("generated_content", ""),
-                hashtags=post.get("hashtags", []),
-                platform_post_id=post.get("platform_post_id"),
-                platform_post_url=post.get("platform_post_url"),
-                status=post.get("status", "posted"),
-                created_at=post.get("created_at", "")
-            ))
+        posts_data = await supabase_service.get_user_posts(user_id, platform, limit)
         
-        return HistoryResponse(
-            success=True,
-            posts=posts
-        )
+        # Rows are already projected to the PostHistoryItem columns, so send
+        # them as-is instead of building (and re-validating) a model per row.
+        # response_model stays for the OpenAPI schema.
+        return _conditional_json(request, {
+            "success": True,
+            "posts": posts_data,
+            "error": None
+        })
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting history: {str(e)}")
+    except Exception:
+        logger.exception("❌ Error getting history")
         return HistoryResponse(
             success=False,
-            error=str(e),
+            error=INTERNAL_ERROR_DETAIL,
             posts=[]
         )
 
 
 @app.get("/api/auth/twitter/login")
-async def twitter_login(authorization: Optional[str] = Header(None)):
+async def twitter_login(user_id: str = Depends(current_user_id)):
     """
     Initiate Twitter OAuth flow.
     Requires user to be authenticated (JWT token in Authorization header).
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        # Generate state for CSRF protection
-        state = secrets.token_urlsafe(32)
+        # Generate state for CSRF protection (128 bits is plenty for a single-use state)
+        state = secrets.token_urlsafe(16)
         
         # Get authorization URL
         auth_url, code_verifier, state = twitter_oauth.get_authorization_url(state)
         
         # Store state and code_verifier temporarily
-        oauth_states[state] = {
+        await oauth_state_store.save("twitter", state, {
             "user_id": user_id,
             "code_verifier": code_verifier
-        }
+        })
         
         # Return auth URL for frontend to redirect
         return {
@@ -389,9 +470,9 @@ async def twitter_login(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error initiating Twitter OAuth: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error initiating Twitter OAuth")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/auth/twitter/callback")
@@ -404,11 +485,11 @@ async def twitter_callback(
     Exchange code for tokens and save to database.
     """
     try:
-        # Verify state
-        if state not in oauth_states:
+        # Verify state (single-use, removed on lookup)
+        oauth_data = await oauth_state_store.pop("twitter", state)
+        if oauth_data is None:
             raise HTTPException(status_code=400, detail="Invalid state parameter")
         
-        oauth_data = oauth_states[state]
         user_id = oauth_data["user_id"]
         code_verifier = oauth_data["code_verifier"]
         
@@ -435,54 +516,55 @@ async def twitter_callback(
             "is_active": True
         }
         
-        success = supabase_service.save_connected_account(account_data)
+        success = await supabase_service.save_connected_account(account_data)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save connection")
         
-        # Clean up state
-        del oauth_states[state]
-        
         # Redirect to frontend success page
-        frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-        return RedirectResponse(url=f"{frontend_url}/settings?connected=twitter")
+        return RedirectResponse(url=FRONTEND_CONNECTED_URLS["twitter"])
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in Twitter callback: {str(e)}")
-        frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-        return RedirectResponse(url=f"{frontend_url}/settings?error={str(e)}")
+        logger.error("❌ Error in Twitter callback: %s", e)
+        return RedirectResponse(url=FRONTEND_ERROR_URL + quote(str(e)))
+
+
+async def _generate_style_profile_after_fetch(user_id: str) -> None:
+    """Rebuild the user's style profile from freshly fetched tweets (background task)."""
+    logger.info("🎨 Generating style profile...")
+    try:
+        await twitter_analysis_service.generate_style_profile(user_id)
+        logger.info("✅ Style profile generated")
+    except Exception as e:
+        logger.warning("⚠️  Warning: Failed to generate style profile: %s", e)
+    
+    # The style profile feeds RAG context
+    rag_context_builder.invalidate_user(user_id)
 
 
 @app.post("/api/twitter/fetch-tweets")
 async def fetch_twitter_tweets(
-    authorization: Optional[str] = Header(None),
+    background_tasks: BackgroundTasks,
+    user_id: str = Depends(current_user_id),
     limit: int = Query(20, ge=1, le=100)
 ):
     """
     Fetch user's tweets from Twitter and save to database.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         limit: Number of tweets to fetch (default 20, max 100)
         
     Returns:
         dict: Summary of fetched tweets
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n🐦 Fetching tweets for user {user_id}...")
+        logger.info("🐦 Fetching tweets for user %s...", user_id)
         
         # Get user's Twitter connection
-        account = supabase_service.get_connected_account(user_id, "twitter")
+        account = await supabase_service.get_connected_account(user_id, "twitter")
         if not account:
             raise HTTPException(
                 status_code=404,
@@ -493,46 +575,34 @@ async def fetch_twitter_tweets(
         if not access_token:
             raise HTTPException(status_code=401, detail="No valid Twitter access token found")
         
-        # Check if token is expired and refresh if needed
-        expires_at = account.get("expires_at")
-        if expires_at:
-            from datetime import datetime
-            if isinstance(expires_at, str):
-                expires_at = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-            
-            if twitter_oauth.is_token_expired(expires_at):
-                print(f"🔄 Token expired, refreshing for user {user_id}...")
-                try:
-                    token_response = await twitter_oauth.refresh_access_token(account["refresh_token"])
-                    access_token = token_response["access_token"]
-                    
-                    # Update tokens in database
-                    new_expires_at = twitter_oauth.calculate_token_expiry(token_response.get("expires_in", 7200))
-                    supabase_service.update_platform_tokens(
-                        user_id,
-                        "twitter",
-                        access_token,
-                        token_response.get("refresh_token", account["refresh_token"]),
-                        new_expires_at
-                    )
-                    print(f"✅ Token refreshed successfully")
-                except Exception as e:
-                    print(f"❌ Failed to refresh token: {str(e)}")
-                    raise HTTPException(
-                        status_code=401,
-                        detail="Your Twitter session has expired. Please reconnect your account."
-                    )
-        
-        # Fetch tweets from Twitter API
-        print(f"📥 Fetching {limit} tweets from Twitter API...")
+        # Refresh the token if it has expired
+        access_token = await _get_valid_twitter_token(user_id, account)
+        
+        # Fetch tweets from Twitter API, saving each page as it arrives
+        logger.info("📥 Fetching %s tweets from Twitter API...", limit)
+        total_fetched = 0
+        most_recent_tweet_id = None
+        save_result = {"new_tweets": 0, "existing_tweets": 0, "errors": []}
         try:
-            tweets_response = await twitter_oauth.batch_fetch_all_tweets(
+            async for page in twitter_oauth.iter_tweet_pages(
                 access_token=access_token,
                 limit=limit
-            )
+            ):
+                tweets_data = page["data"]
+                if most_recent_tweet_id is None:
+                    most_recent_tweet_id = tweets_data[0].get("id")
+                total_fetched += len(tweets_data)
+                
+                page_result = await twitter_data_service.save_twitter_tweets(
+                    user_id=user_id,
+                    tweets_data=tweets_data
+                )
+                save_result["new_tweets"] += page_result["new_tweets"]
+                save_result["existing_tweets"] += page_result["existing_tweets"]
+                save_result["errors"].extend(page_result.get("errors", []))
         except Exception as fetch_error:
             error_msg = str(fetch_error)
-            print(f"❌ Twitter API Error: {error_msg}")
+            logger.error("❌ Twitter API Error: %s", error_msg)
             
             # Check for rate limit error
             if "429" in error_msg or "Too Many Requests" in error_msg:
@@ -544,10 +614,7 @@ async def fetch_twitter_tweets(
             # Re-raise other errors
             raise
         
-        tweets_data = tweets_response.get("data", [])
-        total_fetched = len(tweets_data)
-        
-        if not tweets_data:
+        if not total_fetched:
             return {
                 "success": True,
                 "message": "No tweets found",
@@ -556,17 +623,8 @@ async def fetch_twitter_tweets(
                 "existing_tweets": 0
             }
         
-        print(f"✅ Fetched {total_fetched} tweets from Twitter")
-        
-        # Save tweets to database
-        print(f"💾 Saving tweets to database...")
-        save_result = await twitter_data_service.save_twitter_tweets(
-            user_id=user_id,
-            tweets_data=tweets_data
-        )
-        
-        # Get the most recent tweet ID
-        most_recent_tweet_id = tweets_data[0].get("id") if tweets_data else None
+        logger.info("✅ Fetched %s tweets from Twitter", total_fetched)
+        logger.info("✅ Saved %s new tweets, %s already existed", save_result['new_tweets'], save_result['existing_tweets'])
         
         # Update fetch log
         await twitter_data_service.update_twitter_fetch_log(
@@ -575,17 +633,10 @@ async def fetch_twitter_tweets(
             total_count=save_result["new_tweets"],
             fetch_type="manual"
         )
+        rag_context_builder.invalidate_user(user_id)
         
-        print(f"✅ Saved {save_result['new_tweets']} new tweets, {save_result['existing_tweets']} already existed")
-        
-        # Generate style profile automatically
-        print(f"🎨 Generating style profile...")
-        try:
-            style_profile = await twitter_analysis_service.generate_style_profile(user_id)
-            print(f"✅ Style profile generated")
-        except Exception as e:
-            print(f"⚠️  Warning: Failed to generate style profile: {str(e)}")
-            # Don't fail the whole request if style profile generation fails
+        # Regenerate the style profile after the response is sent
+        background_tasks.add_task(_generate_style_profile_after_fetch, user_id)
         
         return {
             "success": True,
@@ -593,98 +644,77 @@ async def fetch_twitter_tweets(
             "total_fetched": total_fetched,
             "new_tweets": save_result["new_tweets"],
             "existing_tweets": save_result["existing_tweets"],
-            "errors": save_result.get("errors", [])
+            "errors": save_result["errors"]
         }
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error fetching tweets: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error fetching tweets")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/twitter/tweets")
 async def get_user_tweets(
-    authorization: Optional[str] = Header(None),
+    request: Request,
+    user_id: str = Depends(current_user_id),
     limit: int = Query(100, ge=1, le=1000)
 ):
     """
     Get user's stored tweets from database.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         limit: Number of tweets to retrieve (default 100)
         
     Returns:
         dict: List of stored tweets
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        # Get tweets from database
-        tweets = await twitter_data_service.get_user_tweets_from_db(user_id, limit)
-        
-        # Get stats
-        stats = await twitter_data_service.get_tweet_stats(user_id)
-        
-        # Get fetch log
-        fetch_log = await twitter_data_service.get_fetch_log(user_id)
+        # Get tweets, stats and fetch log from database concurrently
+        tweets, stats, fetch_log = await asyncio.gather(
+            twitter_data_service.get_user_tweets_from_db(user_id, limit),
+            twitter_data_service.get_tweet_stats(user_id),
+            twitter_data_service.get_fetch_log(user_id)
+        )
         
-        return {
+        # Up to 1000 plain rows: hand them to orjson without jsonable_encoder
+        return _conditional_json(request, {
             "success": True,
             "tweets": tweets,
             "stats": stats,
             "fetch_log": fetch_log
-        }
+        })
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting tweets: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting tweets")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/twitter/style-profile")
 async def get_twitter_style_profile(
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Get user's Twitter style profile.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         
     Returns:
         dict: Style profile with writing patterns and preferences
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
+        # Get style profile (generated on first read if it doesn't exist)
+        profile = await twitter_analysis_service.get_or_generate_style_profile(user_id)
         
-        # Get style profile
-        profile = await twitter_analysis_service.get_style_profile(user_id)
-        
-        if not profile:
-            # Try to generate if doesn't exist
-            print(f"📊 No style profile found, generating...")
-            profile = await twitter_analysis_service.generate_style_profile(user_id)
-            
-            if profile.get("error"):
-                raise HTTPException(
-                    status_code=404,
-                    detail="No style profile available. Please fetch your tweets first."
-                )
+        if profile.get("error"):
+            raise HTTPException(
+                status_code=404,
+                detail="No style profile available. Please fetch your tweets first."
+            )
         
         return {
             "success": True,
@@ -693,37 +723,30 @@ async def get_twitter_style_profile(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting style profile: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting style profile")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.post("/api/twitter/regenerate-style-profile")
 async def regenerate_style_profile(
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Regenerate user's Twitter style profile.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         
     Returns:
         dict: Newly generated style profile
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n🔄 Regenerating style profile for user {user_id}...")
+        logger.info("🔄 Regenerating style profile for user %s...", user_id)
         
         # Generate new profile
         profile = await twitter_analysis_service.generate_style_profile(user_id)
+        rag_context_builder.invalidate_user(user_id)
         
         if profile.get("error"):
             raise HTTPException(
@@ -739,36 +762,28 @@ async def regenerate_style_profile(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error regenerating style profile: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error regenerating style profile")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/auth/github/login")
-async def github_login(authorization: Optional[str] = Header(None)):
+async def github_login(user_id: str = Depends(current_user_id)):
     """
     Initiate GitHub OAuth flow.
     Requires user to be authenticated (JWT token in Authorization header).
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        # Generate state for CSRF protection
-        state = secrets.token_urlsafe(32)
+        # Generate state for CSRF protection (128 bits is plenty for a single-use state)
+        state = secrets.token_urlsafe(16)
         
         # Get authorization URL
         auth_url, state = github_oauth.get_authorization_url(state)
         
         # Store state temporarily
-        oauth_states[state] = {
+        await oauth_state_store.save("github", state, {
             "user_id": user_id
-        }
+        })
         
         # Return auth URL for frontend to redirect
         return {
@@ -778,9 +793,9 @@ async def github_login(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error initiating GitHub OAuth: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error initiating GitHub OAuth")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/auth/github/callback")
@@ -793,11 +808,11 @@ async def github_callback(
     Exchange code for tokens and save to database.
     """
     try:
-        # Verify state
-        if state not in oauth_states:
+        # Verify state (single-use, removed on lookup)
+        oauth_data = await oauth_state_store.pop("github", state)
+        if oauth_data is None:
             raise HTTPException(status_code=400, detail="Invalid state parameter")
         
-        oauth_data = oauth_states[state]
         user_id = oauth_data["user_id"]
         
         # Exchange code for tokens
@@ -819,128 +834,94 @@ async def github_callback(
             "is_active": True
         }
         
-        success = supabase_service.save_connected_account(account_data)
+        success = await supabase_service.save_connected_account(account_data)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save connection")
         
-        # Clean up state
-        del oauth_states[state]
-        
         # Redirect to frontend success page
-        frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-        return RedirectResponse(url=f"{frontend_url}/settings?connected=github")
+        return RedirectResponse(url=FRONTEND_CONNECTED_URLS["github"])
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in GitHub callback: {str(e)}")
-        frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
-        return RedirectResponse(url=f"{frontend_url}/settings?error={str(e)}")
+        logger.error("❌ Error in GitHub callback: %s", e)
+        return RedirectResponse(url=FRONTEND_ERROR_URL + quote(str(e)))
 
 
 @app.get("/api/connections")
-async def get_connections(authorization: Optional[str] = Header(None)):
+async def get_connections(user_id: str = Depends(current_user_id)):
     """
     Get user's connected social media accounts.
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        # Get connected accounts
-        accounts = supabase_service.get_connected_accounts(user_id)
-        
-        # Remove sensitive data
-        safe_accounts = []
-        for account in accounts:
-            safe_accounts.append({
-                "platform": account["platform"],
-                "platform_username": account.get("platform_username"),
-                "is_active": account.get("is_active", True),
-                "connected_at": account.get("connected_at")
-            })
+        # Only public fields are selected, so tokens never leave the database
+        accounts = await supabase_service.get_connected_accounts(user_id)
         
         return {
             "success": True,
-            "connections": safe_accounts
+            "connections": accounts
         }
     
     except HTTPException:
         raise
+    except Exception:
+        logger.exception("❌ Error getting connections")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
+
+
+async def _revoke_twitter_token(access_token: str) -> None:
+    """Revoke a Twitter token, logging (not raising) on failure."""
+    try:
+        await twitter_oauth.revoke_token(access_token)
     except Exception as e:
-        print(f"❌ Error getting connections: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.warning("⚠️  Failed to revoke Twitter token: %s", e)
+
+
+async def _delete_github_data(user_id: str) -> None:
+    """Delete a disconnected user's GitHub data; failures are logged, not raised."""
+    logger.info("🗑️  Cleaning up GitHub data...")
+    try:
+        deleted = await github_data_service.delete_user_github_data(user_id)
+        rag_context_builder.invalidate_user(user_id)
+        logger.info("✅ Deleted %s commits", deleted.get('commits', 0))
+        logger.info("✅ Deleted %s fetch logs", deleted.get('logs', 0))
+        logger.info("✅ Deleted user context")
+        
+        logger.info("✅ All GitHub data cleaned up successfully")
+    except Exception:
+        logger.warning("⚠️  Warning: Failed to clean up some GitHub data", exc_info=True)
+        # Don't fail the disconnect if cleanup fails
 
 
 @app.delete("/api/connections/{platform}")
 async def disconnect_account(
     platform: str,
-    authorization: Optional[str] = Header(None)
+    background_tasks: BackgroundTasks,
+    user_id: str = Depends(current_user_id)
 ):
     """
     Disconnect a social media account and clean up all related data.
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n🔌 User {user_id} - Disconnecting {platform}...")
+        logger.info("🔌 User %s - Disconnecting %s...", user_id, platform)
         
         # Get account to revoke token
-        account = supabase_service.get_platform_connection(user_id, platform)
+        account = await supabase_service.get_platform_connection(user_id, platform)
         
         if account and platform == "twitter":
-            # Revoke token on Twitter
-            await twitter_oauth.revoke_token(account["access_token"])
+            # Revoke token on Twitter after responding; the local disconnect
+            # doesn't depend on it
+            background_tasks.add_task(_revoke_twitter_token, account["access_token"])
         
-        # Delete from database
-        success = supabase_service.delete_connected_account(user_id, platform)
+        success = await supabase_service.delete_connected_account(user_id, platform)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to disconnect account")
         
-        # Clean up platform-specific data
+        # Only clean up data once the connection is really gone
         if platform == "github":
-            print(f"🗑️  Cleaning up GitHub data...")
-            try:
-                # Delete all GitHub commits
-                result = supabase_service.client.table("github_activity").delete().eq(
-                    "user_id", user_id
-                ).execute()
-                commits_deleted = len(result.data) if result.data else 0
-                print(f"✅ Deleted {commits_deleted} commits")
-                
-                # Delete fetch logs
-                result = supabase_service.client.table("github_data_fetch_log").delete().eq(
-                    "user_id", user_id
-                ).execute()
-                logs_deleted = len(result.data) if result.data else 0
-                print(f"✅ Deleted {logs_deleted} fetch logs")
-                
-                # Delete user context
-                result = supabase_service.client.table("user_context").delete().eq(
-                    "user_id", user_id
-                ).execute()
-                context_deleted = len(result.data) if result.data else 0
-                print(f"✅ Deleted user context")
-                
-                print(f"✅ All GitHub data cleaned up successfully")
-            except Exception as e:
-                print(f"⚠️  Warning: Failed to clean up some GitHub data: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                # Don't fail the disconnect if cleanup fails
+            await _delete_github_data(user_id)
         
         return {
             "success": True,
@@ -949,39 +930,96 @@ async def disconnect_account(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error disconnecting account: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error disconnecting account")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
+
+
+async def _process_fetched_commits(user_id: str, fetch_type: str, new_commits: int) -> None:
+    """
+    Build initial context and embeddings for freshly fetched commits.
+    
+    Runs after /api/github/fetch-data has responded: both steps call external
+    AI APIs and can take far longer than the fetch itself.
+    
+    Args:
+        user_id: Authenticated user ID
+        fetch_type: 'initial' or 'refresh'
+        new_commits: Number of commits that were newly saved
+    """
+    # Auto-update context only on first fetch (to save API costs)
+    if fetch_type == "initial":
+        logger.info("🤖 First fetch detected - Generating initial context...")
+        try:
+            # Check if context already exists
+            context_exists = await context_service.context_exists(user_id)
+            if not context_exists:
+                await context_service.update_user_context(user_id, use_ai=True)
+                logger.info("✅ Initial context generated successfully")
+        except Exception as e:
+            logger.warning("⚠️ Warning: Failed to generate context: %s", e)
+    
+    # Auto-generate embeddings for new commits (Phase 3)
+    if new_commits > 0:
+        logger.info("🔢 Auto-generating embeddings for %s new commits...", new_commits)
+        try:
+            embedding_job_service = get_embedding_job_service()
+            embedding_result = await embedding_job_service.generate_embedding_for_new_commits(
+                user_id,
+                batch_size=50
+            )
+            logger.info("✅ Generated %s embeddings", embedding_result['embeddings_generated'])
+        except Exception as e:
+            logger.warning("⚠️ Warning: Failed to generate embeddings: %s", e)
+    
+    # Context and embeddings change what RAG returns
+    rag_context_builder.invalidate_user(user_id)
 
 
+# In-flight GitHub fetch per (user, days); concurrent requests share its result
+_github_fetch_inflight = {}
+
+# Context/embedding jobs started by fetches (kept referenced until they finish)
+_github_postprocess_tasks = set()
+
 @app.post("/api/github/fetch-data")
 async def fetch_github_data(
-    authorization: Optional[str] = Header(None),
+    user_id: str = Depends(current_user_id),
     days: int = 30
 ):
     """
     Fetch GitHub commits and store in database.
     
+    A second request while a fetch for the same user and days is still running
+    waits for that fetch instead of starting another one.
+    
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         days: Number of days to fetch (default: 30)
         
     Returns:
-        Success message with count of commits fetched
+        Success message with count of commits fetched (context and
+        embeddings are generated in the background afterwards)
     """
+    # The lookup and insert have no await in between, so no lock is needed
+    key = (user_id, days)
+    task = _github_fetch_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_run_github_fetch(user_id, days))
+        _github_fetch_inflight[key] = task
+        task.add_done_callback(lambda _: _github_fetch_inflight.pop(key, None))
+    
+    # Shielded so a client disconnect doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def _run_github_fetch(user_id: str, days: int) -> dict:
+    """Fetch and store a user's GitHub commits (body of /api/github/fetch-data)."""
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n📦 User {user_id} - Fetching GitHub data...")
+        logger.info("📦 User %s - Fetching GitHub data...", user_id)
         
         # Get user's GitHub connection
-        github_account = supabase_service.get_platform_connection(user_id, "github")
+        github_account = await supabase_service.get_platform_connection(user_id, "github")
         
         if not github_account:
             raise HTTPException(
@@ -998,18 +1036,21 @@ async def fetch_github_data(
         access_token = github_account["access_token"]
         username = github_account["platform_username"]
         
-        # Check if this is first fetch or refresh
-        last_fetch_info = await github_data_service.get_last_fetch_info(user_id)
+        # Check if this is first fetch or refresh, and get the last commit date
+        # for an incremental fetch (both lookups at once)
+        last_fetch_info, last_commit_date = await asyncio.gather(
+            github_data_service.get_last_fetch_info(user_id),
+            github_data_service.get_last_commit_date(user_id)
+        )
         fetch_type = "initial" if not last_fetch_info else "refresh"
         
-        # Get last commit date for incremental fetch
         since_date = None
         if fetch_type == "refresh":
-            since_date = await github_data_service.get_last_commit_date(user_id)
-            print(f"📅 Last commit date: {since_date}")
+            since_date = last_commit_date
+            logger.info("📅 Last commit date: %s", since_date)
         
         # Fetch commits from GitHub
-        print(f"🔄 Fetching commits from GitHub (last {days} days)...")
+        logger.info("🔄 Fetching commits from GitHub (last %s days)...", days)
         result = await github_oauth.batch_fetch_commits(
             access_token=access_token,
             username=username,
@@ -1019,59 +1060,27 @@ async def fetch_github_data(
         )
         
         commits = result["commits"]
-        print(f"✅ Fetched {len(commits)} commits from {result['repositories_checked']} repositories")
+        logger.info("✅ Fetched %s commits from %s repositories", len(commits), result['repositories_checked'])
         
         # Save commits to database
         if commits:
-            print(f"💾 Saving commits to database...")
-            save_result = await github_data_service.save_github_commits(user_id, commits)
+            logger.info("💾 Saving commits to database...")
+            # Also records the fetch log (and its last commit date) in the same call
+            save_result = await github_data_service.save_github_commits(user_id, commits, fetch_type)
             
             new_commits = save_result["new_commits"]
             skipped = save_result["skipped"]
             
-            print(f"✅ Saved {new_commits} new commits (skipped {skipped} duplicates)")
-            
-            # Update fetch log
-            from datetime import datetime
-            last_commit_date = None
-            if commits:
-                last_commit_date_str = commits[0]["commit"]["author"]["date"]
-                last_commit_date = datetime.fromisoformat(last_commit_date_str.replace("Z", "+00:00"))
+            logger.info("✅ Saved %s new commits (skipped %s duplicates)", new_commits, skipped)
             
-            await github_data_service.update_fetch_log(
-                user_id=user_id,
-                last_commit_date=last_commit_date,
-                total_count=new_commits,
-                fetch_type=fetch_type
-            )
+            # New commits change what RAG returns
+            rag_context_builder.invalidate_user(user_id)
             
-            # Auto-update context only on first fetch (to save API costs)
-            if fetch_type == "initial":
-                print(f"🤖 First fetch detected - Generating initial context...")
-                try:
-                    # Check if context already exists
-                    context_exists = await context_service.context_exists(user_id)
-                    if not context_exists:
-                        await context_service.update_user_context(user_id, use_ai=True)
-                        print(f"✅ Initial context generated successfully")
-                except Exception as e:
-                    print(f"⚠️ Warning: Failed to generate context: {str(e)}")
-                    # Don't fail the whole request if context generation fails
-            
-            # Auto-generate embeddings for new commits (Phase 3)
-            embedding_result = None
-            if new_commits > 0:
-                print(f"\n🔢 Auto-generating embeddings for {new_commits} new commits...")
-                try:
-                    embedding_job_service = get_embedding_job_service()
-                    embedding_result = await embedding_job_service.generate_embedding_for_new_commits(
-                        user_id,
-                        batch_size=50
-                    )
-                    print(f"✅ Generated {embedding_result['embeddings_generated']} embeddings")
-                except Exception as e:
-                    print(f"⚠️ Warning: Failed to generate embeddings: {str(e)}")
-                    # Don't fail the whole request if embedding generation fails
+            # Context and embedding generation run after the response is sent,
+            # owned by this fetch rather than by whichever request started it
+            postprocess = asyncio.create_task(_process_fetched_commits(user_id, fetch_type, new_commits))
+            _github_postprocess_tasks.add(postprocess)
+            postprocess.add_done_callback(_github_postprocess_tasks.discard)
             
             return {
                 "success": True,
@@ -1081,7 +1090,7 @@ async def fetch_github_data(
                     "skipped_duplicates": skipped,
                     "repositories_checked": result['repositories_checked'],
                     "fetch_type": fetch_type,
-                    "embeddings_generated": embedding_result["embeddings_generated"] if embedding_result else 0
+                    "embeddings_queued": new_commits > 0
                 }
             }
         else:
@@ -1098,16 +1107,14 @@ async def fetch_github_data(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error fetching GitHub data: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error fetching GitHub data")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/github/activity")
 async def get_github_activity(
-    authorization: Optional[str] = Header(None),
+    user_id: str = Depends(current_user_id),
     limit: int = 100,
     days: Optional[int] = None
 ):
@@ -1115,7 +1122,7 @@ async def get_github_activity(
     Get user's stored GitHub activity.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         limit: Maximum number of commits to return (default: 100)
         days: Only return commits from last N days (optional)
         
@@ -1123,27 +1130,22 @@ async def get_github_activity(
         List of commits from database
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        # Get activity from database
-        activity = await github_data_service.get_user_github_activity(
-            user_id=user_id,
-            limit=limit,
-            days=days
+        # Get activity and additional stats from database concurrently
+        activity, total_commits, repositories, last_fetch_info = await asyncio.gather(
+            github_data_service.get_user_github_activity(
+                user_id=user_id,
+                limit=limit,
+                days=days,
+                columns=ACTIVITY_LIST_COLUMNS
+            ),
+            github_data_service.get_commit_count(user_id),
+            github_data_service.get_repositories(user_id),
+            github_data_service.get_last_fetch_info(user_id)
         )
         
-        # Get additional stats
-        total_commits = await github_data_service.get_commit_count(user_id)
-        repositories = await github_data_service.get_repositories(user_id)
-        last_fetch_info = await github_data_service.get_last_fetch_info(user_id)
-        
-        return {
+        # Rows are plain JSON from Supabase: serialize with orjson directly
+        # instead of walking every commit through jsonable_encoder
+        return ORJSONResponse({
             "success": True,
             "data": {
                 "commits": activity,
@@ -1151,123 +1153,86 @@ async def get_github_activity(
                 "repositories": repositories,
                 "last_fetch": last_fetch_info
             }
-        }
+        })
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting GitHub activity: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting GitHub activity")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/github/status")
-async def get_github_status(authorization: Optional[str] = Header(None)):
+async def get_github_status(request: Request, user_id: str = Depends(current_user_id)):
     """
     Get GitHub data freshness status with smart refresh recommendations.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         
     Returns:
         Status information about GitHub data with refresh recommendations
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
+        status = await github_data_service.get_status(user_id)
         
-        # Get comprehensive refresh recommendation
-        recommendation = await github_data_service.get_refresh_recommendation(user_id)
-        
-        # Get repositories list
-        repositories = await github_data_service.get_repositories(user_id)
-        
-        return {
+        return _conditional_json(request, {
             "success": True,
-            "data": {
-                "total_commits": recommendation["total_commits_stored"],
-                "last_fetch_time": recommendation["last_fetch_time"],
-                "last_commit_date": recommendation["last_commit_date"],
-                "needs_refresh": recommendation["should_refresh"],
-                "hours_since_fetch": recommendation["hours_since_fetch"],
-                "refresh_reason": recommendation["reason"],
-                "has_data": recommendation["has_data"],
-                "repositories_count": len(repositories),
-                "repositories": repositories
-            }
-        }
+            "data": status
+        })
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting GitHub status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting GitHub status")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/github/refresh-check")
 async def check_refresh_needed(
-    authorization: Optional[str] = Header(None),
+    request: Request,
+    user_id: str = Depends(current_user_id),
     hours_threshold: int = 24
 ):
     """
     Check if GitHub data needs refresh based on custom threshold.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         hours_threshold: Hours after which data is considered stale (default: 24)
         
     Returns:
         Simple refresh check result
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Check if refresh is needed
         refresh_check = await github_data_service.should_refresh_data(user_id, hours_threshold)
         
-        return {
+        return _conditional_json(request, {
             "success": True,
             "data": refresh_check
-        }
+        })
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error checking refresh status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error checking refresh status")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/github/context")
-async def get_github_context(authorization: Optional[str] = Header(None)):
+async def get_github_context(user_id: str = Depends(current_user_id)):
     """
     Get user's GitHub context summary (cached).
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         
     Returns:
         User context with projects, tech stack, and activity summary
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n📊 User {user_id} - Getting GitHub context...")
+        logger.info("📊 User %s - Getting GitHub context...", user_id)
         
         # Get cached context
         context = await context_service.get_user_context(user_id)
@@ -1286,36 +1251,28 @@ async def get_github_context(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting GitHub context: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting GitHub context")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.post("/api/github/analyze")
-async def analyze_github_data(authorization: Optional[str] = Header(None)):
+async def analyze_github_data(user_id: str = Depends(current_user_id)):
     """
     Analyze GitHub data and generate AI insights (manual refresh).
     This endpoint costs API tokens as it calls Gemini.
     
     Args:
-        authorization: JWT token in Authorization header
+        user_id: Authenticated user ID (from JWT)
         
     Returns:
         Updated context with fresh AI insights
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n🤖 User {user_id} - Analyzing GitHub data with AI...")
+        logger.info("🤖 User %s - Analyzing GitHub data with AI...", user_id)
         
         # Check if user has any GitHub data
-        github_account = supabase_service.get_platform_connection(user_id, "github")
+        github_account = await supabase_service.get_platform_connection(user_id, "github")
         
         if not github_account:
             raise HTTPException(
@@ -1325,6 +1282,7 @@ async def analyze_github_data(authorization: Optional[str] = Header(None)):
         
         # Refresh AI insights
         context = await context_service.refresh_ai_insights(user_id)
+        rag_context_builder.invalidate_user(user_id)
         
         return {
             "success": True,
@@ -1334,9 +1292,9 @@ async def analyze_github_data(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error analyzing GitHub data: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error analyzing GitHub data")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 # ============================================================================
@@ -1346,7 +1304,7 @@ async def analyze_github_data(authorization: Optional[str] = Header(None)):
 @app.post("/api/embeddings/generate")
 async def generate_embedding(
     request: dict,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Generate embedding for a single text.
@@ -1368,14 +1326,6 @@ async def generate_embedding(
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get text from request
         text = request.get("text")
         if not text:
@@ -1383,32 +1333,34 @@ async def generate_embedding(
         
         task_type = request.get("task_type", "RETRIEVAL_DOCUMENT")
         
-        print(f"\n🔢 User {user_id} - Generating embedding for text: {text[:50]}...")
+        logger.info("🔢 User %s - Generating embedding for text: %s...", user_id, text[:50])
         
-        # Generate embedding
+        # Generate embedding (batched with concurrent requests)
         embedding_service = get_embedding_service()
-        embedding = embedding_service.generate_embedding(text, task_type=task_type)
+        embedding = await get_embedding_batcher().generate_embedding(text, task_type=task_type)
         
-        return {
+        # Hand the vector straight to orjson; returning a dict would first walk
+        # every float through jsonable_encoder
+        return ORJSONResponse({
             "success": True,
             "embedding": embedding,
             "dimension": len(embedding),
             "text_length": len(text),
             "task_type": task_type,
             "model": embedding_service.model
-        }
+        })
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error generating embedding: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error generating embedding")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.post("/api/embeddings/batch")
 async def generate_embeddings_batch(
     request: dict,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Generate embeddings for multiple texts in one API call (efficient).
@@ -1428,14 +1380,6 @@ async def generate_embeddings_batch(
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get texts from request
         texts = request.get("texts")
         if not texts or not isinstance(texts, list):
@@ -1443,32 +1387,39 @@ async def generate_embeddings_batch(
         
         task_type = request.get("task_type", "RETRIEVAL_DOCUMENT")
         
-        print(f"\n🔢 User {user_id} - Generating {len(texts)} embeddings in batch...")
+        logger.info("🔢 User %s - Generating %s embeddings in batch...", user_id, len(texts))
         
-        # Generate embeddings
+        # Generate embeddings (texts seen recently are served from cache)
         embedding_service = get_embedding_service()
-        embeddings = embedding_service.generate_embeddings_batch(texts, task_type=task_type)
+        embeddings = await get_embedding_batcher().generate_embeddings(texts, task_type=task_type)
         
-        return {
+        # Serialize with orjson directly (skips jsonable_encoder over every float)
+        return ORJSONResponse({
             "success": True,
             "embeddings": embeddings,
             "count": len(embeddings),
             "dimension": len(embeddings[0]) if embeddings else 0,
             "task_type": task_type,
             "model": embedding_service.model
-        }
+        })
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error generating batch embeddings: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error generating batch embeddings")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
+
+
+# Similarity above each threshold gets the next label (bisect_left keeps the
+# comparisons strict: exactly 0.95 is still "Very similar")
+SIMILARITY_THRESHOLDS = (0.4, 0.6, 0.8, 0.95)
+SIMILARITY_LABELS = ("Not similar", "Slightly similar", "Somewhat similar", "Very similar", "Identical")
 
 
 @app.post("/api/embeddings/similarity")
 async def calculate_similarity(
     request: dict,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Calculate similarity between two texts.
@@ -1488,14 +1439,6 @@ async def calculate_similarity(
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get texts from request
         text1 = request.get("text1")
         text2 = request.get("text2")
@@ -1503,12 +1446,15 @@ async def calculate_similarity(
         if not text1 or not text2:
             raise HTTPException(status_code=400, detail="Both text1 and text2 are required")
         
-        print(f"\n🔍 User {user_id} - Calculating similarity...")
+        logger.info("🔍 User %s - Calculating similarity...", user_id)
         
-        # Generate embeddings
+        # Generate both embeddings (cached, and batched into one call on a miss)
         embedding_service = get_embedding_service()
-        emb1 = embedding_service.generate_embedding(text1, task_type="SEMANTIC_SIMILARITY")
-        emb2 = embedding_service.generate_embedding(text2, task_type="SEMANTIC_SIMILARITY")
+        embedding_batcher = get_embedding_batcher()
+        emb1, emb2 = await asyncio.gather(
+            embedding_batcher.generate_embedding(text1, task_type="SEMANTIC_SIMILARITY"),
+            embedding_batcher.generate_embedding(text2, task_type="SEMANTIC_SIMILARITY")
+        )
         
         # Calculate similarity
         similarity = embedding_service.calculate_similarity(emb1, emb2)
@@ -1518,37 +1464,24 @@ async def calculate_similarity(
             "similarity": round(similarity, 4),
             "text1": text1,
             "text2": text2,
-            "interpretation": (
-                "Identical" if similarity > 0.95 else
-                "Very similar" if similarity > 0.8 else
-                "Somewhat similar" if similarity > 0.6 else
-                "Slightly similar" if similarity > 0.4 else
-                "Not similar"
-            )
+            "interpretation": SIMILARITY_LABELS[bisect.bisect_left(SIMILARITY_THRESHOLDS, similarity)]
         }
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error calculating similarity: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error calculating similarity")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/embeddings/info")
-async def get_embedding_info(authorization: Optional[str] = Header(None)):
+async def get_embedding_info(user_id: str = Depends(current_user_id)):
     """
     Get information about the embedding model.
     
     Returns model details, dimensions, and capabilities.
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        supabase_service.verify_jwt_token(token)
-        
         # Get model info
         embedding_service = get_embedding_service()
         info = embedding_service.get_model_info()
@@ -1560,9 +1493,9 @@ async def get_embedding_info(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting embedding info: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting embedding info")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 # ============================================================================
@@ -1572,7 +1505,7 @@ async def get_embedding_info(authorization: Optional[str] = Header(None)):
 @app.post("/api/github/embeddings/generate")
 async def generate_github_embeddings(
     request: dict,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Generate embeddings for GitHub commits.
@@ -1594,17 +1527,9 @@ async def generate_github_embeddings(
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         batch_size = request.get("batch_size", 50)
         
-        print(f"\n🔢 User {user_id} - Generating embeddings for GitHub commits...")
+        logger.info("🔢 User %s - Generating embeddings for GitHub commits...", user_id)
         
         # Get commits without embeddings
         commits = await github_data_service.get_commits_without_embeddings(user_id, limit=batch_size)
@@ -1617,19 +1542,20 @@ async def generate_github_embeddings(
                 "stats": await github_data_service.get_embedding_stats(user_id)
             }
         
-        print(f"   Found {len(commits)} commits without embeddings")
+        logger.info("   Found %s commits without embeddings", len(commits))
         
         # Extract commit messages for batch embedding
         commit_messages = [commit["commit_message"] for commit in commits]
         
         # Generate embeddings in batch
         embedding_service = get_embedding_service()
-        embeddings = embedding_service.generate_embeddings_batch(
+        embeddings = await asyncio.to_thread(
+            embedding_service.generate_embeddings_batch,
             commit_messages,
             task_type="RETRIEVAL_DOCUMENT"
         )
         
-        print(f"   Generated {len(embeddings)} embeddings")
+        logger.info("   Generated %s embeddings", len(embeddings))
         
         # Prepare batch data for saving
         commit_embeddings = []
@@ -1646,7 +1572,8 @@ async def generate_github_embeddings(
             commit_embeddings
         )
         
-        print(f"   Saved {result['success']} embeddings, {result['failed']} failed")
+        logger.info("   Saved %s embeddings, %s failed", result['success'], result['failed'])
+        rag_context_builder.invalidate_user(user_id)
         
         # Get updated stats
         stats = await github_data_service.get_embedding_stats(user_id)
@@ -1661,17 +1588,15 @@ async def generate_github_embeddings(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error generating GitHub embeddings: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error generating GitHub embeddings")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.post("/api/github/embeddings/search")
 async def search_github_commits(
     request: dict,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Search for similar GitHub commits using semantic search.
@@ -1699,14 +1624,6 @@ async def search_github_commits(
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get query parameters
         query = request.get("query")
         if not query:
@@ -1715,11 +1632,11 @@ async def search_github_commits(
         limit = request.get("limit", 10)
         min_similarity = request.get("min_similarity", 0.5)
         
-        print(f"\n🔍 User {user_id} - Searching commits for: '{query}'")
+        logger.info("🔍 User %s - Searching commits for: '%s'", user_id, query)
         
         # Generate query embedding
         embedding_service = get_embedding_service()
-        query_embedding = embedding_service.generate_query_embedding(query)
+        query_embedding = await asyncio.to_thread(embedding_service.generate_query_embedding, query)
         
         # Search for similar commits
         results = await github_data_service.search_similar_commits(
@@ -1729,7 +1646,7 @@ async def search_github_commits(
             min_similarity=min_similarity
         )
         
-        print(f"   Found {len(results)} similar commits")
+        logger.info("   Found %s similar commits", len(results))
         
         return {
             "success": True,
@@ -1741,13 +1658,13 @@ async def search_github_commits(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error searching GitHub commits: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error searching GitHub commits")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/github/embeddings/stats")
-async def get_github_embedding_stats(authorization: Optional[str] = Header(None)):
+async def get_github_embedding_stats(user_id: str = Depends(current_user_id)):
     """
     Get statistics about GitHub commit embeddings.
     
@@ -1764,14 +1681,6 @@ async def get_github_embedding_stats(authorization: Optional[str] = Header(None)
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get embedding stats
         stats = await github_data_service.get_embedding_stats(user_id)
         
@@ -1782,9 +1691,9 @@ async def get_github_embedding_stats(authorization: Optional[str] = Header(None)
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting embedding stats: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting embedding stats")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 # ============================================================================
@@ -1794,7 +1703,7 @@ async def get_github_embedding_stats(authorization: Optional[str] = Header(None)
 @app.post("/api/github/embeddings/generate-all")
 async def generate_all_embeddings(
     request: dict,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Generate embeddings for ALL commits that don't have them (batch job).
@@ -1819,18 +1728,10 @@ async def generate_all_embeddings(
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         batch_size = request.get("batch_size", 50)
         max_commits = request.get("max_commits")
         
-        print(f"\n🚀 User {user_id} - Starting batch embedding generation...")
+        logger.info("🚀 User %s - Starting batch embedding generation...", user_id)
         
         # Run the embedding job
         embedding_job_service = get_embedding_job_service()
@@ -1839,6 +1740,7 @@ async def generate_all_embeddings(
             batch_size=batch_size,
             max_commits=max_commits
         )
+        rag_context_builder.invalidate_user(user_id)
         
         return {
             "success": True,
@@ -1847,15 +1749,13 @@ async def generate_all_embeddings(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error in batch embedding generation: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error in batch embedding generation")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.get("/api/github/embeddings/status")
-async def get_embedding_job_status(authorization: Optional[str] = Header(None)):
+async def get_embedding_job_status(user_id: str = Depends(current_user_id)):
     """
     Get detailed status of embedding generation progress.
     
@@ -1875,14 +1775,6 @@ async def get_embedding_job_status(authorization: Optional[str] = Header(None)):
         }
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get detailed status
         embedding_job_service = get_embedding_job_service()
         status = await embedding_job_service.get_embedding_status(user_id)
@@ -1894,9 +1786,9 @@ async def get_embedding_job_status(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting embedding status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting embedding status")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 # ============================================================================
@@ -1904,7 +1796,7 @@ async def get_embedding_job_status(authorization: Optional[str] = Header(None)):
 # ============================================================================
 
 @app.get("/api/subscription/status")
-async def get_subscription_status(authorization: Optional[str] = Header(None)):
+async def get_subscription_status(user_id: str = Depends(current_user_id)):
     """
     Get user's subscription status.
     
@@ -1912,16 +1804,8 @@ async def get_subscription_status(authorization: Optional[str] = Header(None)):
         Subscription details: plan_type, posts_used, posts_limit, remaining
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         subscription_service = get_subscription_service()
-        status = subscription_service.get_subscription_status(user_id)
+        status = await asyncio.to_thread(subscription_service.get_subscription_status, user_id)
         
         return {
             "success": True,
@@ -1930,13 +1814,13 @@ async def get_subscription_status(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error getting subscription status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error getting subscription status")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.post("/api/payments/create-order")
-async def create_payment_order(authorization: Optional[str] = Header(None)):
+async def create_payment_order(user_id: str = Depends(current_user_id)):
     """
     Create Razorpay order for Pro subscription.
     
@@ -1944,21 +1828,13 @@ async def create_payment_order(authorization: Optional[str] = Header(None)):
         Order details: order_id, amount, key_id for frontend checkout
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
-        print(f"\n💳 User {user_id} - Creating payment order for Pro subscription...")
+        logger.info("💳 User %s - Creating payment order for Pro subscription...", user_id)
         
         # Create Razorpay order (₹5 = 500 paise)
         razorpay_service = get_razorpay_service()
-        order = razorpay_service.create_order(amount=5, currency="INR", user_id=user_id)
+        order = await asyncio.to_thread(razorpay_service.create_order, amount=5, currency="INR", user_id=user_id)
         
-        print(f"✅ Created Razorpay order: {order.get('id')}")
+        logger.info("✅ Created Razorpay order: %s", order.get('id'))
         
         return {
             "success": True,
@@ -1972,15 +1848,15 @@ async def create_payment_order(authorization: Optional[str] = Header(None)):
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error creating payment order: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error creating payment order")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 @app.post("/api/payments/verify")
 async def verify_payment(
     request: dict,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(current_user_id)
 ):
     """
     Verify Razorpay payment and activate Pro subscription.
@@ -1996,14 +1872,6 @@ async def verify_payment(
         Success message and updated subscription
     """
     try:
-        # Verify user is authenticated
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-        
-        token = authorization.split(" ")[1]
-        user_data = supabase_service.verify_jwt_token(token)
-        user_id = user_data.get("sub")
-        
         # Get payment details from request
         razorpay_order_id = request.get("razorpay_order_id")
         razorpay_payment_id = request.get("razorpay_payment_id")
@@ -2012,7 +1880,7 @@ async def verify_payment(
         if not all([razorpay_order_id, razorpay_payment_id, razorpay_signature]):
             raise HTTPException(status_code=400, detail="Missing payment details")
         
-        print(f"\n🔐 User {user_id} - Verifying payment...")
+        logger.info("🔐 User %s - Verifying payment...", user_id)
         
         # Verify payment signature
         razorpay_service = get_razorpay_service()
@@ -2025,11 +1893,12 @@ async def verify_payment(
         if not is_verified:
             raise HTTPException(status_code=400, detail="Payment verification failed")
         
-        print(f"✅ Payment verified successfully")
+        logger.info("✅ Payment verified successfully")
         
         # Upgrade user to Pro
         subscription_service = get_subscription_service()
-        success = subscription_service.upgrade_to_pro(
+        success = await asyncio.to_thread(
+            subscription_service.upgrade_to_pro,
             user_id,
             razorpay_payment_id,
             razorpay_order_id
@@ -2038,10 +1907,10 @@ async def verify_payment(
         if not success:
             raise HTTPException(status_code=500, detail="Failed to upgrade subscription")
         
-        print(f"✅ User {user_id} upgraded to Pro")
+        logger.info("✅ User %s upgraded to Pro", user_id)
         
         # Get updated subscription status
-        status = subscription_service.get_subscription_status(user_id)
+        status = await asyncio.to_thread(subscription_service.get_subscription_status, user_id)
         
         return {
             "success": True,
@@ -2051,14 +1920,30 @@ async def verify_payment(
     
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Error verifying payment: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except Exception:
+        logger.exception("❌ Error verifying payment")
+        raise HTTPException(status_code=500, detail=INTERNAL_ERROR_DETAIL)
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    
+    if os.getenv("ENV") == "dev":
+        # Single process with auto-reload for local development
+        uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    else:
+        # uvloop + httptools. OAuth states and the per-user token refresh locks
+        # live in Redis, so only run one worker per CPU when it is configured
+        workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)) if os.getenv("REDIS_URL") else 1
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            loop="uvloop",
+            http="httptools",
+            workers=workers,
+            access_log=False
+        )
 
 
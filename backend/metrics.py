@@ -0,0 +1,179 @@
+"""
+Request and span timing - per-worker latency stats for finding hot paths.
+
+RouteTimingMiddleware times every request by matched route, and the timed
+decorator times individual service calls (Supabase, Twitter API). Both feed
+one in-process registry that /internal/metrics renders in Prometheus text
+format. Stats are per worker process and reset on restart.
+"""
+
+import functools
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Recent samples kept per series for percentiles (count and sum cover all time)
+SAMPLES_PER_SERIES = 1024
+
+# Quantiles reported for every series
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Polled constantly by the platform; timing it would only add noise
+UNTIMED_PATHS = frozenset({"/health"})
+
+
+class _Series:
+    """Duration samples for one route or span."""
+
+    __slots__ = ("count", "total_ms", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.samples: Deque[float] = deque(maxlen=SAMPLES_PER_SERIES)
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.samples.append(duration_ms)
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {q: ordered[round(q * last)] for q in QUANTILES}
+
+
+# (method, route, status class) -> series and span name -> series
+_routes: Dict[Tuple[str, str, str], _Series] = {}
+_spans: Dict[str, _Series] = {}
+
+
+def record_request(method: str, route: str, status: int, duration_ms: float) -> None:
+    """
+    Record one request's duration.
+
+    Args:
+        method: HTTP method
+        route: Route path template (e.g. /api/connections/{platform})
+        status: Response status code
+        duration_ms: Time from request start to last response byte
+    """
+    key = (method, route, f"{status // 100}xx")
+    series = _routes.get(key)
+    if series is None:
+        series = _routes[key] = _Series()
+    series.add(duration_ms)
+
+
+def record_span(name: str, duration_ms: float) -> None:
+    """
+    Record one span's duration.
+
+    Args:
+        name: Span name (e.g. supabase.get_platform_connection)
+        duration_ms: Time spent in the call
+    """
+    series = _spans.get(name)
+    if series is None:
+        series = _spans[name] = _Series()
+    series.add(duration_ms)
+
+
+def timed(name: str):
+    """
+    Decorate an async function so each call is recorded as a span.
+
+    Args:
+        name: Span name reported in /internal/metrics
+
+    Returns:
+        Decorator for async functions
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record_span(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_summary(lines: list, metric: str, labels: str, series: _Series) -> None:
+    """Append one series as Prometheus summary lines."""
+    for q, value in series.quantiles().items():
+        lines.append(f'{metric}{{{labels},quantile="{q}"}} {value:.3f}')
+    lines.append(f"{metric}_sum{{{labels}}} {series.total_ms:.3f}")
+    lines.append(f"{metric}_count{{{labels}}} {series.count}")
+
+
+def render_prometheus() -> str:
+    """
+    Render all recorded stats in Prometheus text exposition format.
+
+    Returns:
+        Metrics text (durations in milliseconds)
+    """
+    lines = [
+        "# HELP http_request_duration_ms Request duration by route",
+        "# TYPE http_request_duration_ms summary",
+    ]
+    for (method, route, status), series in sorted(_routes.items()):
+        labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+        _render_summary(lines, "http_request_duration_ms", labels, series)
+
+    lines.append("# HELP span_duration_ms Duration of instrumented service calls")
+    lines.append("# TYPE span_duration_ms summary")
+    for name, series in sorted(_spans.items()):
+        _render_summary(lines, "span_duration_ms", f'span="{_escape(name)}"', series)
+
+    return "\n".join(lines) + "\n"
+
+
+class RouteTimingMiddleware:
+    """
+    Time each HTTP request and record it under its matched route.
+
+    Raw ASGI like JWTAuthMiddleware, so the only per-request cost is a wrapped
+    send. Routes are labelled by path template (the router stores the matched
+    route in scope), keeping one series per endpoint rather than per URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNTIMED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            record_request(scope["method"], route_path, status, duration_ms)
+            logger.debug(
+                "route=%s method=%s status=%s dur_ms=%.1f",
+                route_path, scope["method"], status, duration_ms
+            )
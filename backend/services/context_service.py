@@ -1,5 +1,6 @@
 """Context Service - Manage user context from various data sources."""
 
+import asyncio
 import os
 from typing import Dict, Optional
 from datetime import datetime
@@ -7,9 +8,12 @@ from supabase import create_client, Client
 from dotenv import load_dotenv
 from .github_analysis_service import GitHubAnalysisService
 from .gemini_service import GeminiService
+import logging
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class ContextService:
     """Service for managing user context."""
@@ -35,11 +39,12 @@ class ContextService:
         Returns:
             Context object or None if not found
         """
-        result = self.supabase.table("user_context").select(
+        query = self.supabase.table("user_context").select(
             "*"
         ).eq(
             "user_id", user_id
-        ).execute()
+        )
+        result = await asyncio.to_thread(query.execute)
         
         if result.data and len(result.data) > 0:
             return result.data[0]
@@ -74,7 +79,7 @@ class ContextService:
         Returns:
             Updated context object
         """
-        print(f"\n🔄 Updating context for user {user_id}...")
+        logger.info("🔄 Updating context for user %s...", user_id)
         
         # Get basic analysis (no AI cost)
         projects = await self.github_analysis.get_current_projects(user_id, days=30, limit=5)
@@ -95,7 +100,7 @@ class ContextService:
         
         # Add AI insights if requested
         if use_ai and projects:
-            print("🤖 Generating AI insights...")
+            logger.info("🤖 Generating AI insights...")
             ai_insights = await self._generate_ai_insights(user_id, projects, tech_stack)
             context_data["ai_insights"] = ai_insights
         else:
@@ -106,18 +111,20 @@ class ContextService:
         
         if existing_context:
             # Update existing context
-            result = self.supabase.table("user_context").update(
+            query = self.supabase.table("user_context").update(
                 context_data
             ).eq(
                 "user_id", user_id
-            ).execute()
+            )
+            result = await asyncio.to_thread(query.execute)
         else:
             # Create new context
-            result = self.supabase.table("user_context").insert(
+            query = self.supabase.table("user_context").insert(
                 context_data
-            ).execute()
+            )
+            result = await asyncio.to_thread(query.execute)
         
-        print(f"✅ Context updated successfully")
+        logger.info("✅ Context updated successfully")
         
         return result.data[0] if result.data else context_data
     
@@ -176,9 +183,7 @@ class ContextService:
                 "generated_at": datetime.utcnow().isoformat()
             }
         except Exception as e:
-            print(f"❌ Error generating AI insights: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error generating AI insights: %s", e)
             return {
                 "focus_areas": [],
                 "key_achievements": [],
@@ -241,7 +246,7 @@ Return ONLY valid JSON, no additional text."""
         Returns:
             Updated context with new AI insights
         """
-        print(f"\n🔄 Refreshing AI insights for user {user_id}...")
+        logger.info("🔄 Refreshing AI insights for user %s...", user_id)
         
         # Get current context
         context = await self.get_user_context(user_id)
@@ -262,14 +267,15 @@ Return ONLY valid JSON, no additional text."""
         ai_insights = await self._generate_ai_insights(user_id, projects, tech_stack)
         
         # Update only AI insights
-        result = self.supabase.table("user_context").update({
+        query = self.supabase.table("user_context").update({
             "ai_insights": ai_insights,
             "last_updated": datetime.utcnow().isoformat()
         }).eq(
             "user_id", user_id
-        ).execute()
+        )
+        result = await asyncio.to_thread(query.execute)
         
-        print(f"✅ AI insights refreshed successfully")
+        logger.info("✅ AI insights refreshed successfully")
         
         return result.data[0] if result.data else context
 
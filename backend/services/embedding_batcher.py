@@ -0,0 +1,231 @@
+"""
+Embedding Batcher - Micro-batch and cache embedding requests.
+
+Requests from concurrent callers are collected for a short window and sent to
+Gemini as one batch embed call per task type. Unlike generation (see
+gemini_batcher), embed_content takes a real list of independent inputs, so a
+whole window costs one RPC. Identical texts in a window are embedded once.
+
+Embeddings are deterministic for a given (text, task_type), so results are
+also kept in a bounded TTL cache and repeated texts skip Gemini entirely.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_service import EmbeddingService, get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+# Batching window (Gemini accepts up to 100 inputs per batch call)
+MAX_BATCH = 64
+MAX_WAIT_MS = 8
+
+# Cached vectors are ~6 KB each (768 float64s), so keep the cache small
+EMBEDDING_CACHE_TTL_SECONDS = 3600
+EMBEDDING_CACHE_MAX_ENTRIES = 5000
+
+
+class EmbeddingBatcher:
+    """Queue that batches and caches embedding calls."""
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: int = MAX_WAIT_MS
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            embedding_service: Service used to make the actual embedding calls
+            max_batch: Maximum requests collected per batch
+            max_wait_ms: Maximum time to wait for a batch to fill
+        """
+        self.embedding_service = embedding_service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: asyncio.Queue = None
+        self._worker: asyncio.Task = None
+        self._loop = None
+        self._dispatch_tasks = set()
+
+        # sha256(task_type, text) prefix -> (expires_at, vector)
+        self._cache: Dict[bytes, Tuple[float, np.ndarray]] = {}
+
+    @staticmethod
+    def _cache_key(text: str, task_type: str) -> bytes:
+        """Build the cache key for a text and task type."""
+        return hashlib.sha256(f"{task_type}\x00{text}".encode("utf-8")).digest()[:16]
+
+    def _cache_get(self, key: bytes) -> Optional[List[float]]:
+        """Return a cached embedding (as a fresh list) or None."""
+        entry = self._cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1].tolist()
+        return None
+
+    def _cache_set(self, key: bytes, embedding: List[float]) -> None:
+        """Store an embedding, evicting the oldest entry when full."""
+        self._cache.pop(key, None)
+        self._cache[key] = (time.monotonic() + EMBEDDING_CACHE_TTL_SECONDS, np.asarray(embedding))
+        if len(self._cache) > EMBEDDING_CACHE_MAX_ENTRIES:
+            del self._cache[next(iter(self._cache))]
+
+    async def generate_embedding(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> List[float]:
+        """
+        Batched, non-blocking equivalent of EmbeddingService.generate_embedding.
+
+        Args:
+            text: The text to embed (max 2,048 tokens)
+            task_type: Embedding task type (e.g. RETRIEVAL_DOCUMENT)
+
+        Returns:
+            Normalized embedding vector
+        """
+        # The batch call drops empty texts, which would misalign results
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+
+        key = self._cache_key(text, task_type)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        self._ensure_worker()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((text, task_type), future))
+        embedding = await future
+        self._cache_set(key, embedding)
+        # Callers may modify the vector, don't share it between them
+        return list(embedding)
+
+    async def generate_embeddings(self, texts: List[str], task_type: str = "RETRIEVAL_DOCUMENT") -> List[List[float]]:
+        """
+        Cached, non-blocking equivalent of EmbeddingService.generate_embeddings_batch.
+
+        Only texts missing from the cache are sent to Gemini, in one call.
+
+        Args:
+            texts: Texts to embed (empty texts are skipped, as in the service)
+            task_type: Embedding task type (e.g. RETRIEVAL_DOCUMENT)
+
+        Returns:
+            List of embedding vectors for the non-empty texts, in order
+        """
+        if not texts:
+            raise ValueError("Texts list cannot be empty")
+
+        valid_texts = [t for t in texts if t and t.strip()]
+        if not valid_texts:
+            raise ValueError("All texts are empty")
+
+        keys = [self._cache_key(text, task_type) for text in valid_texts]
+        embeddings = [self._cache_get(key) for key in keys]
+
+        # Embed each missing text once, even if it appears several times
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(valid_texts, embeddings) if embedding is None
+        ))
+        if missing:
+            fetched = await asyncio.to_thread(
+                self.embedding_service.generate_embeddings_batch,
+                missing,
+                task_type=task_type
+            )
+            by_text = dict(zip(missing, fetched))
+            for i, text in enumerate(valid_texts):
+                if embeddings[i] is None:
+                    embeddings[i] = list(by_text[text])
+                    self._cache_set(keys[i], by_text[text])
+
+        return embeddings
+
+    def _ensure_worker(self) -> None:
+        """Start the background worker on the current event loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Collect requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without blocking collection of the next batch
+            # (keep a reference so the task isn't garbage collected mid-flight)
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Tuple[str, str], asyncio.Future]]) -> None:
+        """Make one batch embed call per task type and resolve all futures."""
+        # task_type -> text -> futures waiting on it
+        groups: Dict[str, Dict[str, List[asyncio.Future]]] = {}
+        for (text, task_type), future in batch:
+            groups.setdefault(task_type, {}).setdefault(text, []).append(future)
+
+        if len(batch) > 1:
+            logger.debug("📦 Embedding batch: %d requests, %d calls", len(batch), len(groups))
+
+        task_types = list(groups.keys())
+        results = await asyncio.gather(
+            *(
+                # The Gemini client is sync; keep the call off the event loop
+                asyncio.to_thread(
+                    self.embedding_service.generate_embeddings_batch,
+                    list(groups[task_type].keys()),
+                    task_type=task_type
+                )
+                for task_type in task_types
+            ),
+            return_exceptions=True
+        )
+
+        for task_type, result in zip(task_types, results):
+            for i, futures in enumerate(groups[task_type].values()):
+                for future in futures:
+                    if future.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result[i])
+
+
+# Singleton instance
+_embedding_batcher = None
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """
+    Get or create the singleton EmbeddingBatcher instance.
+
+    Returns:
+        Shared EmbeddingBatcher instance
+    """
+    global _embedding_batcher
+    if _embedding_batcher is None:
+        _embedding_batcher = EmbeddingBatcher(get_embedding_service())
+    return _embedding_batcher
@@ -8,6 +8,7 @@ This service handles:
 - Efficient API usage with batching
 """
 
+import asyncio
 import os
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -15,9 +16,12 @@ from dotenv import load_dotenv
 
 from .embedding_service import get_embedding_service
 from .github_data_service import GitHubDataService
+import logging
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class EmbeddingJobService:
     """Service for managing embedding generation jobs."""
@@ -55,8 +59,8 @@ class EmbeddingJobService:
         """
         batch_size = batch_size or self.default_batch_size
         
-        print(f"\n🔄 Starting embedding generation for user {user_id}")
-        print(f"   Batch size: {batch_size}")
+        logger.info("🔄 Starting embedding generation for user %s", user_id)
+        logger.info("   Batch size: %s", batch_size)
         
         total_processed = 0
         total_generated = 0
@@ -69,7 +73,7 @@ class EmbeddingJobService:
             commits_to_process = initial_stats["commits_without_embeddings"]
             
             if commits_to_process == 0:
-                print("   ✅ All commits already have embeddings!")
+                logger.info("   ✅ All commits already have embeddings!")
                 return {
                     "total_processed": 0,
                     "embeddings_generated": 0,
@@ -79,12 +83,12 @@ class EmbeddingJobService:
                     "message": "All commits already have embeddings"
                 }
             
-            print(f"   Found {commits_to_process} commits without embeddings")
+            logger.info("   Found %s commits without embeddings", commits_to_process)
             
             # Apply max_commits limit if specified
             if max_commits:
                 commits_to_process = min(commits_to_process, max_commits)
-                print(f"   Limited to {commits_to_process} commits")
+                logger.info("   Limited to %s commits", commits_to_process)
             
             # Process in batches
             while total_processed < commits_to_process:
@@ -92,8 +96,8 @@ class EmbeddingJobService:
                 remaining = commits_to_process - total_processed
                 current_batch_size = min(batch_size, remaining)
                 
-                print(f"\n   📦 Processing batch {batches_processed + 1}...")
-                print(f"      Progress: {total_processed}/{commits_to_process}")
+                logger.info("   📦 Processing batch %s...", batches_processed + 1)
+                logger.info("      Progress: %s/%s", total_processed, commits_to_process)
                 
                 # Get commits without embeddings
                 commits = await self.github_data_service.get_commits_without_embeddings(
@@ -102,7 +106,7 @@ class EmbeddingJobService:
                 )
                 
                 if not commits:
-                    print("      No more commits to process")
+                    logger.info("      No more commits to process")
                     break
                 
                 # Extract commit messages
@@ -110,12 +114,13 @@ class EmbeddingJobService:
                 
                 try:
                     # Generate embeddings in batch
-                    embeddings = self.embedding_service.generate_embeddings_batch(
+                    embeddings = await asyncio.to_thread(
+                        self.embedding_service.generate_embeddings_batch,
                         commit_messages,
                         task_type="RETRIEVAL_DOCUMENT"
                     )
                     
-                    print(f"      ✅ Generated {len(embeddings)} embeddings")
+                    logger.info("      ✅ Generated %s embeddings", len(embeddings))
                     
                     # Prepare batch data for saving
                     commit_embeddings = []
@@ -137,12 +142,12 @@ class EmbeddingJobService:
                     total_processed += len(commits)
                     batches_processed += 1
                     
-                    print(f"      💾 Saved {result['success']} embeddings")
+                    logger.info("      💾 Saved %s embeddings", result['success'])
                     if result["failed"] > 0:
-                        print(f"      ⚠️  Failed to save {result['failed']} embeddings")
+                        logger.warning("      ⚠️  Failed to save %s embeddings", result['failed'])
                 
                 except Exception as e:
-                    print(f"      ❌ Error processing batch: {str(e)}")
+                    logger.error("      ❌ Error processing batch: %s", e)
                     total_failed += len(commits)
                     total_processed += len(commits)
                     batches_processed += 1
@@ -151,12 +156,12 @@ class EmbeddingJobService:
             # Get final stats
             final_stats = await self.github_data_service.get_embedding_stats(user_id)
             
-            print(f"\n✅ Embedding generation complete!")
-            print(f"   Total processed: {total_processed}")
-            print(f"   Successfully generated: {total_generated}")
-            print(f"   Failed: {total_failed}")
-            print(f"   Batches: {batches_processed}")
-            print(f"   Progress: {final_stats['percentage_complete']}%")
+            logger.info("✅ Embedding generation complete!")
+            logger.info("   Total processed: %s", total_processed)
+            logger.info("   Successfully generated: %s", total_generated)
+            logger.info("   Failed: %s", total_failed)
+            logger.info("   Batches: %s", batches_processed)
+            logger.info("   Progress: %s%%", final_stats['percentage_complete'])
             
             return {
                 "total_processed": total_processed,
@@ -168,9 +173,7 @@ class EmbeddingJobService:
             }
         
         except Exception as e:
-            print(f"❌ Error in embedding generation: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error in embedding generation: %s", e)
             
             # Get current stats even if error occurred
             try:
@@ -205,7 +208,7 @@ class EmbeddingJobService:
         Returns:
             dict: Generation results
         """
-        print(f"\n🆕 Generating embeddings for new commits only...")
+        logger.info("🆕 Generating embeddings for new commits only...")
         
         # Get commits without embeddings
         commits = await self.github_data_service.get_commits_without_embeddings(
@@ -221,14 +224,15 @@ class EmbeddingJobService:
                 "message": "No new commits to process"
             }
         
-        print(f"   Found {len(commits)} new commits")
+        logger.info("   Found %s new commits", len(commits))
         
         # Extract commit messages
         commit_messages = [commit["commit_message"] for commit in commits]
         
         try:
             # Generate embeddings in batch
-            embeddings = self.embedding_service.generate_embeddings_batch(
+            embeddings = await asyncio.to_thread(
+                self.embedding_service.generate_embeddings_batch,
                 commit_messages,
                 task_type="RETRIEVAL_DOCUMENT"
             )
@@ -248,7 +252,7 @@ class EmbeddingJobService:
                 commit_embeddings
             )
             
-            print(f"   ✅ Generated and saved {result['success']} embeddings")
+            logger.info("   ✅ Generated and saved %s embeddings", result['success'])
             
             return {
                 "total_processed": len(commits),
@@ -258,7 +262,7 @@ class EmbeddingJobService:
             }
         
         except Exception as e:
-            print(f"   ❌ Error generating embeddings for new commits: {str(e)}")
+            logger.error("   ❌ Error generating embeddings for new commits: %s", e)
             return {
                 "total_processed": len(commits),
                 "embeddings_generated": 0,
@@ -337,8 +341,8 @@ class EmbeddingJobService:
                 "message": "Use force=True to regenerate existing embeddings"
             }
         
-        print(f"\n🔄 Regenerating ALL embeddings for user {user_id}")
-        print("   ⚠️  This will replace existing embeddings")
+        logger.info("🔄 Regenerating ALL embeddings for user %s", user_id)
+        logger.warning("   ⚠️  This will replace existing embeddings")
         
         # Get all commits (with or without embeddings)
         commits = await self.github_data_service.get_user_github_activity(
@@ -17,7 +17,9 @@ from typing import List, Dict, Optional
 from google import genai
 from google.genai import types
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
@@ -42,7 +44,7 @@ class EmbeddingService:
         # Can be changed to 1536 or 3072 for better quality
         self.dimension = 768
         
-        print(f"✅ EmbeddingService initialized with model: {self.model} ({self.dimension}D)")
+        logger.info("✅ EmbeddingService initialized with model: %s (%sD)", self.model, self.dimension)
     
     def generate_embedding(
         self, 
@@ -88,7 +90,7 @@ class EmbeddingService:
             return normalized
         
         except Exception as e:
-            print(f"❌ Error generating embedding: {str(e)}")
+            logger.error("❌ Error generating embedding: %s", e)
             raise Exception(f"Failed to generate embedding: {str(e)}")
     
     def generate_embeddings_batch(
@@ -142,11 +144,11 @@ class EmbeddingService:
                 for e in result.embeddings
             ]
             
-            print(f"✅ Generated {len(embeddings)} embeddings in batch")
+            logger.info("✅ Generated %s embeddings in batch", len(embeddings))
             return embeddings
         
         except Exception as e:
-            print(f"❌ Error generating batch embeddings: {str(e)}")
+            logger.error("❌ Error generating batch embeddings: %s", e)
             raise Exception(f"Failed to generate batch embeddings: {str(e)}")
     
     def generate_query_embedding(self, query: str) -> List[float]:
@@ -200,17 +202,16 @@ class EmbeddingService:
             Similarity: 0.87
         """
         try:
-            # Convert to numpy arrays
-            e1 = np.array(embedding1).reshape(1, -1)
-            e2 = np.array(embedding2).reshape(1, -1)
+            # Cosine similarity as one NumPy dot product
+            e1 = np.asarray(embedding1, dtype=np.float32)
+            e2 = np.asarray(embedding2, dtype=np.float32)
             
-            # Calculate cosine similarity
-            similarity = cosine_similarity(e1, e2)[0][0]
+            similarity = np.dot(e1, e2) / (np.linalg.norm(e1) * np.linalg.norm(e2) + 1e-12)
             
             return float(similarity)
         
         except Exception as e:
-            print(f"❌ Error calculating similarity: {str(e)}")
+            logger.error("❌ Error calculating similarity: %s", e)
             raise Exception(f"Failed to calculate similarity: {str(e)}")
     
     def find_most_similar(
@@ -240,20 +241,21 @@ class EmbeddingService:
             >>> results = service.find_most_similar(query_emb, docs, top_k=2)
         """
         try:
-            # Calculate similarity for each document
+            docs = [doc for doc in document_embeddings if 'embedding' in doc]
+            if not docs:
+                return []
+            
+            # Score every document with one matrix-vector product
+            similarities = self.cosine_similarities(
+                query_embedding,
+                [doc['embedding'] for doc in docs]
+            )
+            
+            # Add similarity score to each document
             results = []
-            for doc in document_embeddings:
-                if 'embedding' not in doc:
-                    continue
-                
-                similarity = self.calculate_similarity(
-                    query_embedding, 
-                    doc['embedding']
-                )
-                
-                # Add similarity score to document
+            for doc, similarity in zip(docs, similarities):
                 result = doc.copy()
-                result['similarity'] = similarity
+                result['similarity'] = float(similarity)
                 results.append(result)
             
             # Sort by similarity (highest first)
@@ -263,9 +265,26 @@ class EmbeddingService:
             return results[:top_k]
         
         except Exception as e:
-            print(f"❌ Error finding similar documents: {str(e)}")
+            logger.error("❌ Error finding similar documents: %s", e)
             raise Exception(f"Failed to find similar documents: {str(e)}")
     
+    @staticmethod
+    def cosine_similarities(query_embedding: List[float], embeddings: List[List[float]]) -> np.ndarray:
+        """
+        Cosine similarity of one query vector against many vectors.
+        
+        Args:
+            query_embedding: The query embedding vector
+            embeddings: Embedding vectors to compare against
+        
+        Returns:
+            Array of similarity scores, one per embedding
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        return (matrix @ query) / (norms + 1e-12)
+    
     def _normalize_embedding(self, values: List[float]) -> List[float]:
         """
         Normalize embedding vector to unit length.
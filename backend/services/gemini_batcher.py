@@ -0,0 +1,140 @@
+"""
+Gemini Batcher - Coalesce concurrent Gemini hashtag requests.
+
+Requests already queued when the worker wakes are dispatched together (no
+extra wait, so a lone request goes out immediately). Identical requests in a
+batch (same content and platform) share a single Gemini call, and each
+distinct request is sent concurrently.
+
+Note: Gemini's generate_content treats a list of contents as one conversation,
+not as independent prompts, so distinct prompts can't share one RPC. Coalescing
+duplicates is the part of batching that actually saves calls. Tweet generation
+doesn't go through here: users sending the same prompt must get their own tweet.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from .gemini_service import GeminiService
+
+logger = logging.getLogger(__name__)
+
+# Batching window (0: never hold a request back waiting for company)
+MAX_BATCH = 16
+MAX_WAIT_MS = 0
+
+
+class GeminiBatcher:
+    """Queue that batches generate_hashtags calls."""
+
+    def __init__(
+        self,
+        gemini_service: GeminiService,
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: int = MAX_WAIT_MS
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            gemini_service: Service used to make the actual Gemini calls
+            max_batch: Maximum requests collected per batch
+            max_wait_ms: Maximum time to wait for a batch to fill
+        """
+        self.gemini_service = gemini_service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue: asyncio.Queue = None
+        self._worker: asyncio.Task = None
+        self._loop = None
+        self._dispatch_tasks = set()
+
+    async def generate_hashtags(self, content: str, platform: str = "twitter") -> List[str]:
+        """
+        Batched equivalent of GeminiService.generate_hashtags.
+
+        Args:
+            content: The generated content
+            platform: Target platform (twitter, linkedin, reddit)
+
+        Returns:
+            List of hashtags
+        """
+        hashtags = await self._submit((content, platform))
+        # Callers may trim the list in place, don't share it between them
+        return list(hashtags)
+
+    async def _submit(self, key: Tuple[str, str]) -> List[str]:
+        """Queue a request and wait for its result."""
+        self._ensure_worker()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((key, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        """Start the background worker on the current event loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Collect requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+
+            # Take whatever else is already queued, then wait only if configured to
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch without blocking collection of the next batch
+            # (keep a reference so the task isn't garbage collected mid-flight)
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Tuple, asyncio.Future]]) -> None:
+        """Run one Gemini call per distinct request and resolve all futures."""
+        groups: Dict[Tuple, List[asyncio.Future]] = {}
+        for key, future in batch:
+            groups.setdefault(key, []).append(future)
+
+        if len(batch) > 1:
+            logger.debug("📦 Gemini batch: %d requests, %d unique", len(batch), len(groups))
+
+        keys = list(groups.keys())
+        results = await asyncio.gather(
+            *(self._call(key) for key in keys),
+            return_exceptions=True
+        )
+
+        for key, result in zip(keys, results):
+            for future in groups[key]:
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _call(self, key: Tuple[str, str]) -> List[str]:
+        """Make the underlying Gemini call for a request key."""
+        content, platform = key
+        return await self.gemini_service.generate_hashtags(content, platform)
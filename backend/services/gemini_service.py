@@ -3,6 +3,9 @@ import asyncio
 from google import genai
 from typing import List
 from prompts.templates import TWEET_GENERATION_PROMPT, HASHTAG_GENERATION_PROMPT, get_platform_prompt
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class GeminiService:
@@ -60,7 +63,7 @@ class GeminiService:
             return content
         
         except Exception as e:
-            print(f"Error generating content: {str(e)}")
+            logger.error("Error generating content: %s", e)
             raise Exception(f"Failed to generate content: {str(e)}")
     
     async def generate_hashtags(self, content: str, platform: str = "twitter") -> List[str]:
@@ -108,6 +111,6 @@ class GeminiService:
             return hashtags[:max_hashtags]
         
         except Exception as e:
-            print(f"Error generating hashtags: {str(e)}")
+            logger.error("Error generating hashtags: %s", e)
             # Return empty list if hashtag generation fails
             return []
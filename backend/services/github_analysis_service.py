@@ -1,5 +1,6 @@
 """GitHub Analysis Service - Analyze GitHub activity data."""
 
+import asyncio
 import os
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
@@ -53,13 +54,14 @@ class GitHubAnalysisService:
         since_date = datetime.utcnow() - timedelta(days=days)
         
         # Get commits from last N days
-        result = self.supabase.table("github_activity").select(
+        query = self.supabase.table("github_activity").select(
             "repository_name"
         ).eq(
             "user_id", user_id
         ).gte(
             "commit_date", since_date.isoformat()
-        ).execute()
+        )
+        result = await asyncio.to_thread(query.execute)
         
         if not result.data:
             return []
@@ -86,13 +88,14 @@ class GitHubAnalysisService:
             List of languages: ["Python", "TypeScript", "React", ...]
         """
         # Get all unique languages from commits
-        result = self.supabase.table("github_activity").select(
+        query = self.supabase.table("github_activity").select(
             "language"
         ).eq(
             "user_id", user_id
         ).not_.is_(
             "language", "null"
-        ).execute()
+        )
+        result = await asyncio.to_thread(query.execute)
         
         if not result.data:
             return []
@@ -129,7 +132,7 @@ class GitHubAnalysisService:
         since_date = datetime.utcnow() - timedelta(days=days)
         
         # Get recent commits
-        result = self.supabase.table("github_activity").select(
+        query = self.supabase.table("github_activity").select(
             "*"
         ).eq(
             "user_id", user_id
@@ -137,7 +140,8 @@ class GitHubAnalysisService:
             "commit_date", since_date.isoformat()
         ).order(
             "commit_date", desc=True
-        ).limit(100).execute()
+        ).limit(100)
+        result = await asyncio.to_thread(query.execute)
         
         if not result.data:
             return []
@@ -205,23 +209,25 @@ class GitHubAnalysisService:
         
         # Get commits from last 7 days
         seven_days_ago = now - timedelta(days=7)
-        result_7d = self.supabase.table("github_activity").select(
+        query = self.supabase.table("github_activity").select(
             "commit_date"
         ).eq(
             "user_id", user_id
         ).gte(
             "commit_date", seven_days_ago.isoformat()
-        ).execute()
+        )
+        result_7d = await asyncio.to_thread(query.execute)
         
         # Get commits from last 30 days
         thirty_days_ago = now - timedelta(days=30)
-        result_30d = self.supabase.table("github_activity").select(
+        query = self.supabase.table("github_activity").select(
             "commit_date"
         ).eq(
             "user_id", user_id
         ).gte(
             "commit_date", thirty_days_ago.isoformat()
-        ).execute()
+        )
+        result_30d = await asyncio.to_thread(query.execute)
         
         commits_7d = len(result_7d.data) if result_7d.data else 0
         commits_30d = len(result_30d.data) if result_30d.data else 0
@@ -240,7 +246,7 @@ class GitHubAnalysisService:
             
             for commit in result_30d.data:
                 try:
-                    commit_dt = datetime.fromisoformat(commit["commit_date"].replace("Z", "+00:00"))
+                    commit_dt = datetime.fromisoformat(commit["commit_date"])
                     days_of_week.append(commit_dt.strftime("%A"))
                     hours_of_day.append(commit_dt.hour)
                 except:
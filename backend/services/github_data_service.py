@@ -1,14 +1,33 @@
 """GitHub Data Service - Handles storing and retrieving GitHub activity data."""
 
+import asyncio
 import os
+import time
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import json
+import logging
+
+from .embedding_service import EmbeddingService
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# /api/github/status is polled by the dashboard; serve it from memory briefly.
+# Writes through this service (and disconnect) invalidate the user's entry.
+STATUS_CACHE_TTL_SECONDS = 60
+STATUS_CACHE_MAX_ENTRIES = 10000
+
+# Rows per upsert request in the fallback path (PostgREST row limit)
+COMMIT_INSERT_CHUNK_SIZE = 1000
+
+# Columns the activity list needs (skips raw_data and the embedding vector,
+# which make up most of each row)
+ACTIVITY_LIST_COLUMNS = "id, repository_name, commit_hash, commit_message, commit_date, language, collected_at"
+
 
 class GitHubDataService:
     """Service for managing GitHub activity data in database."""
@@ -21,24 +40,57 @@ class GitHubDataService:
             raise ValueError("Missing Supabase credentials")
         
         self.supabase: Client = create_client(supabase_url, supabase_key)
+        
+        # (kind, user_id) -> (expires_at, value) for status lookups
+        self._status_cache: Dict[tuple, tuple] = {}
+    
+    def _status_cache_get(self, key: tuple):
+        """Return (hit, value) for a live status cache entry."""
+        entry = self._status_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+    
+    def _status_cache_set(self, key: tuple, value) -> None:
+        """Store a status cache entry, evicting the oldest one when full."""
+        self._status_cache.pop(key, None)
+        self._status_cache[key] = (time.monotonic() + STATUS_CACHE_TTL_SECONDS, value)
+        if len(self._status_cache) > STATUS_CACHE_MAX_ENTRIES:
+            del self._status_cache[next(iter(self._status_cache))]
+    
+    def invalidate_status_cache(self, user_id: str) -> None:
+        """
+        Drop cached status data for a user after their GitHub data changes.
+        
+        Args:
+            user_id: User's UUID
+        """
+        self._status_cache.pop(("recommendation", user_id), None)
+        self._status_cache.pop(("repositories", user_id), None)
+        self._status_cache.pop(("status", user_id), None)
     
     async def save_github_commits(
         self, 
         user_id: str, 
-        commits_data: List[Dict]
-    ) -> Dict[str, int]:
+        commits_data: List[Dict],
+        fetch_type: str = "manual"
+    ) -> Dict:
         """
-        Save GitHub commits to database.
+        Save GitHub commits to database and record the fetch in the fetch log.
         
         Args:
             user_id: User's UUID
             commits_data: List of commit objects from GitHub API
+            fetch_type: Type of fetch ('initial', 'refresh', 'manual')
             
         Returns:
-            dict: {"new_commits": count, "skipped": count}
+            dict: {"new_commits": count, "skipped": count,
+                   "last_commit_date": newest commit date (ISO) or None}
         """
-        new_commits = 0
         skipped = 0
+        rows = []
+        seen = set()
+        last_commit_date = None
         
         for commit in commits_data:
             try:
@@ -48,24 +100,23 @@ class GitHubDataService:
                 commit_date_str = commit.get("commit", {}).get("author", {}).get("date")
                 
                 # Parse date
-                commit_date = datetime.fromisoformat(commit_date_str.replace("Z", "+00:00"))
+                commit_date = datetime.fromisoformat(commit_date_str)
                 
                 # Get repository info
                 repo_info = commit.get("repository", {})
                 repository_name = repo_info.get("name", "unknown")
                 language = repo_info.get("language")
                 
-                # Check if commit already exists
-                existing = self.supabase.table("github_activity").select("id").eq(
-                    "commit_hash", commit_hash
-                ).execute()
-                
-                if existing.data:
+                # The same commit can show up twice in one fetch (e.g. forks)
+                if commit_hash in seen:
                     skipped += 1
                     continue
+                seen.add(commit_hash)
+                
+                if last_commit_date is None or commit_date > last_commit_date:
+                    last_commit_date = commit_date
                 
-                # Insert new commit
-                self.supabase.table("github_activity").insert({
+                rows.append({
                     "user_id": user_id,
                     "repository_name": repository_name,
                     "commit_hash": commit_hash,
@@ -73,25 +124,88 @@ class GitHubDataService:
                     "commit_date": commit_date.isoformat(),
                     "language": language,
                     "raw_data": commit
-                }).execute()
-                
-                new_commits += 1
+                })
                 
             except Exception as e:
-                print(f"Error saving commit {commit.get('sha', 'unknown')}: {str(e)}")
+                logger.error("Error parsing commit %s: %s", commit.get('sha', 'unknown'), e)
                 skipped += 1
                 continue
         
+        new_commits = 0
+        last_commit_date_iso = None
+        saved = False
+        if rows:
+            try:
+                # One round-trip: the RPC skips existing hashes, inserts the rest
+                # and writes the fetch log with the newest commit date
+                query = self.supabase.rpc("save_github_commits", {
+                    "p_user_id": user_id,
+                    "p_rows": rows,
+                    "p_fetch_type": fetch_type
+                })
+                result = await asyncio.to_thread(query.execute)
+                new_commits = result.data["new_commits"]
+                last_commit_date_iso = result.data["last_commit_date"]
+                skipped += len(rows) - new_commits
+                saved = True
+            except Exception as e:
+                logger.warning("⚠️  save_github_commits RPC failed, falling back to batched queries: %s", e)
+                new_commits, fallback_skipped = await self._save_github_commits_fallback(rows)
+                skipped += fallback_skipped
+        
+        if not saved:
+            await self.update_fetch_log(user_id, last_commit_date, new_commits, fetch_type)
+            last_commit_date_iso = last_commit_date.isoformat() if last_commit_date else None
+        
+        # The fetch log changed even when every commit was a duplicate
+        self.invalidate_status_cache(user_id)
+        
         return {
             "new_commits": new_commits,
-            "skipped": skipped
+            "skipped": skipped,
+            "last_commit_date": last_commit_date_iso
         }
     
+    async def _save_github_commits_fallback(self, rows: List[Dict]) -> tuple:
+        """
+        Save commit rows without the save_github_commits RPC.
+        
+        Args:
+            rows: github_activity rows, unique by commit_hash
+            
+        Returns:
+            tuple: (new_commits, skipped)
+        """
+        # Postgres skips known hashes via the unique index (ON CONFLICT DO
+        # NOTHING); the exact count is the number of rows actually inserted
+        new_commits = 0
+        skipped = 0
+        for i in range(0, len(rows), COMMIT_INSERT_CHUNK_SIZE):
+            chunk = rows[i:i + COMMIT_INSERT_CHUNK_SIZE]
+            try:
+                query = self.supabase.table("github_activity").upsert(
+                    chunk,
+                    on_conflict="commit_hash",
+                    ignore_duplicates=True,
+                    count="exact",
+                    returning="minimal"
+                )
+                result = await asyncio.to_thread(query.execute)
+                inserted = result.count or 0
+                new_commits += inserted
+                skipped += len(chunk) - inserted
+            except Exception as e:
+                logger.error("Error saving %s commits: %s", len(chunk), e)
+                skipped += len(chunk)
+        
+        return new_commits, skipped
+    
     async def get_user_github_activity(
         self, 
         user_id: str, 
         limit: int = 100,
-        days: Optional[int] = None
+        days: Optional[int] = None,
+        columns: str = "*"
     ) -> List[Dict]:
         """
         Get user's stored GitHub activity.
@@ -100,11 +214,12 @@ class GitHubDataService:
             user_id: User's UUID
             limit: Maximum number of commits to return
             days: Only return commits from last N days (optional)
+            columns: Columns to select (default: all)
             
         Returns:
             list: List of commits from database
         """
-        query = self.supabase.table("github_activity").select("*").eq(
+        query = self.supabase.table("github_activity").select(columns).eq(
             "user_id", user_id
         ).order("commit_date", desc=True).limit(limit)
         
@@ -113,7 +228,8 @@ class GitHubDataService:
             since_date = datetime.utcnow() - timedelta(days=days)
             query = query.gte("commit_date", since_date.isoformat())
         
-        result = query.execute()
+        # Supabase client is sync; run the request in a thread so callers can gather
+        result = await asyncio.to_thread(query.execute)
         return result.data
     
     async def update_fetch_log(
@@ -143,7 +259,9 @@ class GitHubDataService:
             "fetch_type": fetch_type
         }
         
-        result = self.supabase.table("github_data_fetch_log").insert(log_data).execute()
+        query = self.supabase.table("github_data_fetch_log").insert(log_data)
+        result = await asyncio.to_thread(query.execute)
+        self.invalidate_status_cache(user_id)
         return result.data[0] if result.data else {}
     
     async def get_last_fetch_info(self, user_id: str) -> Optional[Dict]:
@@ -156,9 +274,10 @@ class GitHubDataService:
         Returns:
             dict: Last fetch info or None if never fetched
         """
-        result = self.supabase.table("github_data_fetch_log").select("*").eq(
+        query = self.supabase.table("github_data_fetch_log").select("*").eq(
             "user_id", user_id
-        ).order("last_fetch_time", desc=True).limit(1).execute()
+        ).order("last_fetch_time", desc=True).limit(1)
+        result = await asyncio.to_thread(query.execute)
         
         return result.data[0] if result.data else None
     
@@ -172,15 +291,16 @@ class GitHubDataService:
         Returns:
             datetime: Most recent commit date or None
         """
-        result = self.supabase.table("github_activity").select("commit_date").eq(
+        query = self.supabase.table("github_activity").select("commit_date").eq(
             "user_id", user_id
-        ).order("commit_date", desc=True).limit(1).execute()
+        ).order("commit_date", desc=True).limit(1)
+        result = await asyncio.to_thread(query.execute)
         
         if result.data:
             date_str = result.data[0]["commit_date"]
             # Handle various ISO format variations
             try:
-                return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+                return datetime.fromisoformat(date_str)
             except ValueError:
                 # If parsing fails, try parsing with dateutil
                 from dateutil import parser
@@ -198,9 +318,10 @@ class GitHubDataService:
         Returns:
             int: Total commit count
         """
-        result = self.supabase.table("github_activity").select(
+        query = self.supabase.table("github_activity").select(
             "id", count="exact"
-        ).eq("user_id", user_id).execute()
+        ).eq("user_id", user_id)
+        result = await asyncio.to_thread(query.execute)
         
         return result.count if result.count else 0
     
@@ -214,13 +335,19 @@ class GitHubDataService:
         Returns:
             list: List of repository names
         """
-        result = self.supabase.table("github_activity").select(
+        hit, repos = self._status_cache_get(("repositories", user_id))
+        if hit:
+            return repos
+        
+        query = self.supabase.table("github_activity").select(
             "repository_name"
-        ).eq("user_id", user_id).execute()
+        ).eq("user_id", user_id)
+        result = await asyncio.to_thread(query.execute)
         
         # Get unique repository names
-        repos = set(item["repository_name"] for item in result.data)
-        return sorted(list(repos))
+        repos = sorted(set(item["repository_name"] for item in result.data))
+        self._status_cache_set(("repositories", user_id), repos)
+        return repos
     
     async def should_refresh_data(self, user_id: str, hours_threshold: int = 24) -> Dict[str, any]:
         """
@@ -240,7 +367,24 @@ class GitHubDataService:
         """
         last_fetch_info = await self.get_last_fetch_info(user_id)
         
-        if not last_fetch_info:
+        return self._freshness(
+            last_fetch_info["last_fetch_time"] if last_fetch_info else None,
+            hours_threshold
+        )
+    
+    @staticmethod
+    def _freshness(last_fetch_time_str: Optional[str], hours_threshold: int = 24) -> Dict[str, any]:
+        """
+        Build the refresh verdict for a last fetch time (see should_refresh_data).
+        
+        Args:
+            last_fetch_time_str: ISO timestamp of the last fetch, or None
+            hours_threshold: Hours after which data is considered stale
+            
+        Returns:
+            dict: should_refresh, hours_since_fetch, last_fetch_time, reason
+        """
+        if not last_fetch_time_str:
             return {
                 "should_refresh": True,
                 "hours_since_fetch": None,
@@ -248,10 +392,9 @@ class GitHubDataService:
                 "reason": "No data fetched yet"
             }
         
-        last_fetch_time_str = last_fetch_info["last_fetch_time"]
         # Handle various ISO format variations
         try:
-            last_fetch_time = datetime.fromisoformat(last_fetch_time_str.replace("Z", "+00:00"))
+            last_fetch_time = datetime.fromisoformat(last_fetch_time_str)
         except ValueError:
             # If parsing fails, try parsing with dateutil
             from dateutil import parser
@@ -285,11 +428,17 @@ class GitHubDataService:
         Returns:
             dict: Detailed refresh recommendation with stats
         """
-        refresh_check = await self.should_refresh_data(user_id)
-        total_commits = await self.get_commit_count(user_id)
-        last_commit_date = await self.get_last_commit_date(user_id)
+        hit, recommendation = self._status_cache_get(("recommendation", user_id))
+        if hit:
+            return recommendation
         
-        return {
+        refresh_check, total_commits, last_commit_date = await asyncio.gather(
+            self.should_refresh_data(user_id),
+            self.get_commit_count(user_id),
+            self.get_last_commit_date(user_id)
+        )
+        
+        recommendation = {
             "should_refresh": refresh_check["should_refresh"],
             "hours_since_fetch": refresh_check["hours_since_fetch"],
             "last_fetch_time": refresh_check["last_fetch_time"],
@@ -298,6 +447,94 @@ class GitHubDataService:
             "last_commit_date": last_commit_date.isoformat() if last_commit_date else None,
             "has_data": total_commits > 0
         }
+        self._status_cache_set(("recommendation", user_id), recommendation)
+        return recommendation
+    
+    async def get_status(self, user_id: str) -> Dict[str, any]:
+        """
+        Get everything /api/github/status shows, in one round-trip when possible.
+        
+        Args:
+            user_id: User's UUID
+            
+        Returns:
+            dict: Commit count, dates, refresh verdict and repositories
+        """
+        hit, status = self._status_cache_get(("status", user_id))
+        if hit:
+            return status
+        
+        try:
+            # The github_status function returns counts, dates and repositories at once
+            query = self.supabase.rpc("github_status", {"p_user_id": user_id})
+            result = await asyncio.to_thread(query.execute)
+            summary = result.data
+            freshness = self._freshness(summary["last_fetch_time"])
+            last_commit_date = summary["last_commit_date"]
+            total_commits = summary["total_commits"]
+            repositories = sorted(summary["repositories"])
+        except Exception as e:
+            logger.warning("⚠️  github_status RPC failed, falling back to separate queries: %s", e)
+            recommendation, repositories = await asyncio.gather(
+                self.get_refresh_recommendation(user_id),
+                self.get_repositories(user_id)
+            )
+            freshness = recommendation
+            last_commit_date = recommendation["last_commit_date"]
+            total_commits = recommendation["total_commits_stored"]
+        
+        if last_commit_date:
+            # Same format as get_refresh_recommendation (datetime.isoformat)
+            last_commit_date = datetime.fromisoformat(last_commit_date).isoformat()
+        
+        status = {
+            "total_commits": total_commits,
+            "last_fetch_time": freshness["last_fetch_time"],
+            "last_commit_date": last_commit_date,
+            "needs_refresh": freshness["should_refresh"],
+            "hours_since_fetch": freshness["hours_since_fetch"],
+            "refresh_reason": freshness["reason"],
+            "has_data": total_commits > 0,
+            "repositories_count": len(repositories),
+            "repositories": repositories
+        }
+        self._status_cache_set(("status", user_id), status)
+        return status
+    
+    async def delete_user_github_data(self, user_id: str) -> Dict[str, int]:
+        """
+        Delete a user's commits, fetch logs and context (on disconnect).
+        
+        Args:
+            user_id: User's UUID
+            
+        Returns:
+            dict: Deleted row counts {"commits", "logs", "context"}
+        """
+        try:
+            # One round-trip and one transaction for all three tables
+            query = self.supabase.rpc("delete_user_github_data", {"p_user_id": user_id})
+            result = await asyncio.to_thread(query.execute)
+            return result.data or {}
+        except Exception as e:
+            logger.warning("⚠️  delete_user_github_data RPC failed, deleting table by table: %s", e)
+            tables = {
+                "commits": "github_activity",
+                "logs": "github_data_fetch_log",
+                "context": "user_context"
+            }
+            # The tables are independent, so delete from all three at once
+            results = await asyncio.gather(*(
+                asyncio.to_thread(self.supabase.table(table).delete().eq("user_id", user_id).execute)
+                for table in tables.values()
+            ))
+            return {
+                key: len(result.data) if result.data else 0
+                for key, result in zip(tables, results)
+            }
+        finally:
+            # Also after a partial failure: some rows may already be gone
+            self.invalidate_status_cache(user_id)
     
     # ========================================================================
     # EMBEDDING METHODS (Phase 3 - Semantic Search)
@@ -326,14 +563,15 @@ class GitHubDataService:
             embedding_str = json.dumps(embedding)
             
             # Update the commit with the embedding
-            result = self.supabase.table("github_activity").update({
+            query = self.supabase.table("github_activity").update({
                 "embedding": embedding_str
-            }).eq("user_id", user_id).eq("commit_hash", commit_hash).execute()
+            }).eq("user_id", user_id).eq("commit_hash", commit_hash)
+            result = await asyncio.to_thread(query.execute)
             
             return len(result.data) > 0
             
         except Exception as e:
-            print(f"❌ Error saving embedding for commit {commit_hash}: {str(e)}")
+            logger.error("❌ Error saving embedding for commit %s: %s", commit_hash, e)
             return False
     
     async def save_commit_embeddings_batch(
@@ -389,16 +627,17 @@ class GitHubDataService:
             list: Commits without embeddings
         """
         try:
-            result = self.supabase.table("github_activity").select(
+            query = self.supabase.table("github_activity").select(
                 "id, commit_hash, commit_message, commit_date, repository_name, language"
             ).eq("user_id", user_id).is_("embedding", "null").order(
                 "commit_date", desc=True
-            ).limit(limit).execute()
+            ).limit(limit)
+            result = await asyncio.to_thread(query.execute)
             
             return result.data
             
         except Exception as e:
-            print(f"❌ Error getting commits without embeddings: {str(e)}")
+            logger.error("❌ Error getting commits without embeddings: %s", e)
             return []
     
     async def get_commits_with_embeddings(
@@ -417,11 +656,12 @@ class GitHubDataService:
             list: Commits with embeddings
         """
         try:
-            result = self.supabase.table("github_activity").select(
+            query = self.supabase.table("github_activity").select(
                 "id, commit_hash, commit_message, commit_date, repository_name, language, embedding"
             ).eq("user_id", user_id).not_.is_("embedding", "null").order(
                 "commit_date", desc=True
-            ).limit(limit).execute()
+            ).limit(limit)
+            result = await asyncio.to_thread(query.execute)
             
             # Parse embeddings from JSON strings
             for commit in result.data:
@@ -434,7 +674,7 @@ class GitHubDataService:
             return result.data
             
         except Exception as e:
-            print(f"❌ Error getting commits with embeddings: {str(e)}")
+            logger.error("❌ Error getting commits with embeddings: %s", e)
             return []
     
     async def get_embedding_for_commit(
@@ -451,9 +691,10 @@ class GitHubDataService:
             list: Embedding vector or None if not found
         """
         try:
-            result = self.supabase.table("github_activity").select(
+            query = self.supabase.table("github_activity").select(
                 "embedding"
-            ).eq("commit_hash", commit_hash).execute()
+            ).eq("commit_hash", commit_hash)
+            result = await asyncio.to_thread(query.execute)
             
             if result.data and result.data[0].get("embedding"):
                 embedding_str = result.data[0]["embedding"]
@@ -462,7 +703,7 @@ class GitHubDataService:
             return None
             
         except Exception as e:
-            print(f"❌ Error getting embedding for commit {commit_hash}: {str(e)}")
+            logger.error("❌ Error getting embedding for commit %s: %s", commit_hash, e)
             return None
     
     async def search_similar_commits(
@@ -494,7 +735,7 @@ class GitHubDataService:
             # Note: Supabase Python client might need RPC call for vector operations
             # We'll use a stored procedure approach
             
-            result = self.supabase.rpc(
+            query = self.supabase.rpc(
                 'search_similar_commits',
                 {
                     'query_user_id': user_id,
@@ -502,13 +743,14 @@ class GitHubDataService:
                     'match_threshold': 1 - min_similarity,  # Convert similarity to distance
                     'match_count': limit
                 }
-            ).execute()
+            )
+            result = await asyncio.to_thread(query.execute)
             
             return result.data if result.data else []
             
         except Exception as e:
-            print(f"❌ Error searching similar commits: {str(e)}")
-            print(f"   Note: You may need to create the search_similar_commits RPC function in Supabase")
+            logger.error("❌ Error searching similar commits: %s", e)
+            logger.info("   Note: You may need to create the search_similar_commits RPC function in Supabase")
             # Fallback: Get all commits with embeddings and calculate similarity in Python
             return await self._search_similar_commits_fallback(user_id, query_embedding, limit, min_similarity)
     
@@ -531,20 +773,19 @@ class GitHubDataService:
             if not commits:
                 return []
             
-            # Calculate similarity for each commit
-            from sklearn.metrics.pairwise import cosine_similarity
-            import numpy as np
+            commits = [commit for commit in commits if commit.get("embedding")]
+            if not commits:
+                return []
+            
+            # Score all commits with one matrix-vector product
+            similarities = EmbeddingService.cosine_similarities(
+                query_embedding,
+                [commit["embedding"] for commit in commits]
+            )
             
-            query_vec = np.array(query_embedding).reshape(1, -1)
             results = []
-            
-            for commit in commits:
-                if not commit.get("embedding"):
-                    continue
-                
-                commit_vec = np.array(commit["embedding"]).reshape(1, -1)
-                similarity = float(cosine_similarity(query_vec, commit_vec)[0][0])
-                
+            for commit, similarity in zip(commits, similarities):
+                similarity = float(similarity)
                 if similarity >= min_similarity:
                     results.append({
                         "id": commit["id"],
@@ -562,7 +803,7 @@ class GitHubDataService:
             return results[:limit]
             
         except Exception as e:
-            print(f"❌ Error in fallback similarity search: {str(e)}")
+            logger.error("❌ Error in fallback similarity search: %s", e)
             return []
     
     async def get_embedding_stats(self, user_id: str) -> Dict[str, any]:
@@ -579,9 +820,10 @@ class GitHubDataService:
             total_commits = await self.get_commit_count(user_id)
             
             # Count commits with embeddings
-            result = self.supabase.table("github_activity").select(
+            query = self.supabase.table("github_activity").select(
                 "id", count="exact"
-            ).eq("user_id", user_id).not_.is_("embedding", "null").execute()
+            ).eq("user_id", user_id).not_.is_("embedding", "null")
+            result = await asyncio.to_thread(query.execute)
             
             commits_with_embeddings = result.count if result.count else 0
             commits_without_embeddings = total_commits - commits_with_embeddings
@@ -597,7 +839,7 @@ class GitHubDataService:
             }
             
         except Exception as e:
-            print(f"❌ Error getting embedding stats: {str(e)}")
+            logger.error("❌ Error getting embedding stats: %s", e)
             return {
                 "total_commits": 0,
                 "commits_with_embeddings": 0,
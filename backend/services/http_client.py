@@ -0,0 +1,42 @@
+"""
+Shared HTTP client for outbound API calls (Twitter, GitHub).
+
+One pooled httpx.AsyncClient with HTTP/2 and keep-alive is shared by the
+services so TLS handshakes are amortized across requests and concurrent calls
+to the same host can multiplex over one connection.
+"""
+
+import httpx
+
+# Singleton instance
+_http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared AsyncClient.
+
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=200,
+                max_connections=400,
+                keepalive_expiry=60
+            ),
+            timeout=10.0,
+            # GitHub rejects API requests without a User-Agent
+            headers={"User-Agent": "Mataroo/1.0"}
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared AsyncClient (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
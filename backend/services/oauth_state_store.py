@@ -0,0 +1,117 @@
+"""
+OAuth State Store - Short-lived storage for OAuth CSRF state.
+
+Holds the user_id (and PKCE code_verifier for Twitter) between the login
+redirect and the provider callback. Backed by Redis when REDIS_URL is set so
+the callback can land on any worker; falls back to an in-process dict with
+the same TTL semantics for local single-worker development.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# OAuth flows must complete within this window
+OAUTH_STATE_TTL_SECONDS = 600
+
+# Cap on pending in-memory flows so a login loop can't exhaust memory
+OAUTH_STATE_MAX_ENTRIES = 10000
+
+
+class OAuthStateStore:
+    """Single-use OAuth state storage with expiry."""
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = OAUTH_STATE_TTL_SECONDS):
+        """
+        Initialize the state store.
+
+        Args:
+            redis_url: Redis connection URL (in-memory store if None)
+            ttl_seconds: How long a state stays valid
+        """
+        self.ttl_seconds = ttl_seconds
+        self._redis = None
+        # state key -> (expires_at, data), used when Redis isn't configured.
+        # Every entry gets the same TTL, so insertion order is expiry order.
+        self._local: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+        if redis_url:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+        else:
+            logger.warning("⚠️  REDIS_URL not set, OAuth states are kept in memory (single worker only)")
+
+    @staticmethod
+    def _key(platform: str, state: str) -> str:
+        """Build the storage key for a state."""
+        return f"oauth:{platform}:{state}"
+
+    async def save(self, platform: str, state: str, data: Dict) -> None:
+        """
+        Store data for an OAuth state.
+
+        Args:
+            platform: OAuth provider (twitter, github)
+            state: CSRF state parameter
+            data: Values needed in the callback (user_id, code_verifier)
+        """
+        key = self._key(platform, state)
+
+        if self._redis is not None:
+            await self._redis.set(key, json.dumps(data), ex=self.ttl_seconds)
+            return
+
+        self._purge_expired()
+        self._local[key] = (time.monotonic() + self.ttl_seconds, data)
+        while len(self._local) > OAUTH_STATE_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def pop(self, platform: str, state: str) -> Optional[Dict]:
+        """
+        Fetch and delete data for an OAuth state (states are single-use).
+
+        Args:
+            platform: OAuth provider (twitter, github)
+            state: CSRF state parameter
+
+        Returns:
+            Stored data, or None if the state is unknown or expired
+        """
+        key = self._key(platform, state)
+
+        if self._redis is not None:
+            raw = await self._redis.getdel(key)
+            return json.loads(raw) if raw else None
+
+        entry = self._local.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def _purge_expired(self) -> None:
+        """Drop expired in-memory states so abandoned flows don't accumulate."""
+        now = time.monotonic()
+        while self._local and next(iter(self._local.values()))[0] <= now:
+            self._local.popitem(last=False)
+
+
+# Singleton instance
+_oauth_state_store = None
+
+def get_oauth_state_store() -> OAuthStateStore:
+    """
+    Get or create the singleton OAuthStateStore instance.
+
+    Returns:
+        Shared OAuthStateStore instance
+    """
+    global _oauth_state_store
+    if _oauth_state_store is None:
+        _oauth_state_store = OAuthStateStore(os.getenv("REDIS_URL"))
+    return _oauth_state_store
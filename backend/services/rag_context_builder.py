@@ -10,6 +10,9 @@ This service combines:
 To create comprehensive context for better AI-generated content.
 """
 
+import asyncio
+import time
+from collections import OrderedDict
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
@@ -17,6 +20,15 @@ from .embedding_service import get_embedding_service
 from .github_data_service import GitHubDataService
 from .context_service import ContextService
 from .twitter_analysis_service import twitter_analysis_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# How long a built context stays valid for the same user + prompt
+CONTEXT_CACHE_TTL_SECONDS = 300
+CONTEXT_CACHE_MAX_ENTRIES = 1000
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 1000
 
 
 class RAGContextBuilder:
@@ -27,6 +39,29 @@ class RAGContextBuilder:
         self.embedding_service = get_embedding_service()
         self.github_data_service = GitHubDataService()
         self.context_service = ContextService()
+        
+        # (user_id, normalized prompt) -> (expires_at, formatted context)
+        self._context_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        # normalized prompt -> query embedding (prompts embed the same for every user)
+        self._query_embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+    
+    @staticmethod
+    def _normalize_prompt(prompt: str) -> str:
+        """Normalize a prompt for use as a cache key."""
+        return " ".join(prompt.lower().split())
+    
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drop cached context for a user.
+        
+        Call this after the user's commits, embeddings, style profile or
+        context change so the next generation sees fresh data.
+        
+        Args:
+            user_id: User's UUID
+        """
+        for key in [key for key in self._context_cache if key[0] == user_id]:
+            del self._context_cache[key]
     
     async def build_context_for_generation(
         self,
@@ -56,7 +91,7 @@ class RAGContextBuilder:
                 "formatted_context": str    # Ready-to-use text for AI
             }
         """
-        print(f"\n🔍 Building RAG context for prompt: '{user_prompt}'")
+        logger.debug("🔍 Building RAG context for prompt: '%s'", user_prompt)
         
         context = {
             "relevant_commits": [],
@@ -69,28 +104,28 @@ class RAGContextBuilder:
         
         try:
             # 1. Semantic Search: Find relevant commits
-            print("   📊 Searching for semantically similar commits...")
+            logger.debug("   📊 Searching for semantically similar commits...")
             relevant_commits = await self._get_relevant_commits(
                 user_id,
                 user_prompt,
                 limit=max_commits
             )
             context["relevant_commits"] = relevant_commits
-            print(f"   ✅ Found {len(relevant_commits)} relevant commits")
+            logger.debug("   ✅ Found %s relevant commits", len(relevant_commits))
             
             # 2. Get recent activity (optional)
             if include_recent and len(relevant_commits) < max_commits:
-                print("   📅 Getting recent commits...")
+                logger.debug("   📅 Getting recent commits...")
                 recent_commits = await self._get_recent_commits(
                     user_id,
                     limit=max_commits - len(relevant_commits),
                     exclude_hashes=[c["commit_hash"] for c in relevant_commits]
                 )
                 context["recent_commits"] = recent_commits
-                print(f"   ✅ Found {len(recent_commits)} recent commits")
+                logger.debug("   ✅ Found %s recent commits", len(recent_commits))
             
             # 3. Get user context (projects, tech stack)
-            print("   👤 Getting user context...")
+            logger.debug("   👤 Getting user context...")
             user_context = await self.context_service.get_user_context(user_id)
             if user_context:
                 context["user_context"] = {
@@ -99,14 +134,14 @@ class RAGContextBuilder:
                     "focus_areas": user_context.get("ai_insights", {}).get("focus_areas", []),
                     "key_achievements": user_context.get("ai_insights", {}).get("key_achievements", [])
                 }
-                print(f"   ✅ Loaded user context")
+                logger.debug("   ✅ Loaded user context")
             
             # 4. Get Twitter writing style (NEW!)
-            print("   ✍️  Getting Twitter writing style...")
+            logger.debug("   ✍️  Getting Twitter writing style...")
             twitter_style = await self._get_twitter_style(user_id)
             if twitter_style:
                 context["twitter_style"] = twitter_style
-                print(f"   ✅ Loaded writing style")
+                logger.debug("   ✅ Loaded writing style")
             
             # 4. Analyze prompt
             context["prompt_analysis"] = self._analyze_prompt(user_prompt)
@@ -114,14 +149,12 @@ class RAGContextBuilder:
             # 5. Format context for AI
             context["formatted_context"] = self._format_context_for_prompt(context)
             
-            print(f"   ✅ RAG context built successfully")
+            logger.debug("   ✅ RAG context built successfully")
             
             return context
         
         except Exception as e:
-            print(f"   ❌ Error building RAG context: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("   ❌ Error building RAG context: %s", e)
             
             # Return minimal context on error
             return {
@@ -151,8 +184,8 @@ class RAGContextBuilder:
             list: Relevant commits with similarity scores
         """
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_service.generate_query_embedding(query)
+            # Generate query embedding (cached per normalized query)
+            query_embedding = await self._get_query_embedding(query)
             
             # Search for similar commits
             results = await self.github_data_service.search_similar_commits(
@@ -165,9 +198,33 @@ class RAGContextBuilder:
             return results
         
         except Exception as e:
-            print(f"      ⚠️ Error getting relevant commits: {str(e)}")
+            logger.warning("      ⚠️ Error getting relevant commits: %s", e)
             return []
     
+    async def _get_query_embedding(self, query: str) -> List[float]:
+        """
+        Get the query embedding, reusing it for repeated queries.
+        
+        Args:
+            query: Search query text
+            
+        Returns:
+            list: Query embedding vector
+        """
+        key = self._normalize_prompt(query)
+        embedding = self._query_embedding_cache.get(key)
+        
+        if embedding is None:
+            # The Gemini client is sync; keep the call off the event loop
+            embedding = await asyncio.to_thread(self.embedding_service.generate_query_embedding, query)
+            self._query_embedding_cache[key] = embedding
+            if len(self._query_embedding_cache) > QUERY_EMBEDDING_CACHE_MAX_ENTRIES:
+                self._query_embedding_cache.popitem(last=False)
+        else:
+            self._query_embedding_cache.move_to_end(key)
+        
+        return embedding
+    
     async def _get_twitter_style(self, user_id: str) -> Optional[Dict]:
         """
         Get user's Twitter writing style from database.
@@ -199,7 +256,7 @@ class RAGContextBuilder:
             }
         
         except Exception as e:
-            print(f"      ⚠️ Error getting Twitter style: {str(e)}")
+            logger.warning("      ⚠️ Error getting Twitter style: %s", e)
             return None
     
     async def _get_recent_commits(
@@ -243,7 +300,7 @@ class RAGContextBuilder:
             return filtered[:limit]
         
         except Exception as e:
-            print(f"      ⚠️ Error getting recent commits: {str(e)}")
+            logger.warning("      ⚠️ Error getting recent commits: %s", e)
             return []
     
     def _analyze_prompt(self, prompt: str) -> Dict[str, any]:
@@ -315,7 +372,7 @@ class RAGContextBuilder:
                 if date:
                     try:
                         from datetime import datetime
-                        date_obj = datetime.fromisoformat(date.replace("Z", "+00:00"))
+                        date_obj = datetime.fromisoformat(date)
                         date_str = date_obj.strftime("%b %d")
                     except:
                         date_str = "Recently"
@@ -335,7 +392,7 @@ class RAGContextBuilder:
                 date = commit.get("commit_date", "")
                 if date:
                     try:
-                        date_obj = datetime.fromisoformat(date.replace("Z", "+00:00"))
+                        date_obj = datetime.fromisoformat(date)
                         date_str = date_obj.strftime("%b %d")
                     except:
                         date_str = "Recently"
@@ -419,6 +476,12 @@ class RAGContextBuilder:
         Returns:
             str: Formatted context text ready for AI prompt
         """
+        cache_key = (user_id, self._normalize_prompt(user_prompt))
+        cached = self._context_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            self._context_cache.move_to_end(cache_key)
+            return cached[1]
+        
         context = await self.build_context_for_generation(
             user_id,
             user_prompt,
@@ -426,7 +489,16 @@ class RAGContextBuilder:
             max_commits=10  # Increased from 5 to 10 for richer context
         )
         
-        return context.get("formatted_context", "")
+        formatted_context = context.get("formatted_context", "")
+        
+        # Don't cache failed builds
+        if not context.get("error"):
+            self._context_cache[cache_key] = (time.monotonic() + CONTEXT_CACHE_TTL_SECONDS, formatted_context)
+            self._context_cache.move_to_end(cache_key)
+            if len(self._context_cache) > CONTEXT_CACHE_MAX_ENTRIES:
+                self._context_cache.popitem(last=False)
+        
+        return formatted_context
     
     async def get_relevant_commits_for_topic(
         self,
@@ -9,6 +9,9 @@ import razorpay
 import hashlib
 from typing import Dict, Optional
 from fastapi import HTTPException
+import logging
+
+logger = logging.getLogger(__name__)
 
 class RazorpayService:
     """Service for handling Razorpay payments"""
@@ -32,7 +35,7 @@ class RazorpayService:
                 })
         except Exception as e:
             # Ignore if set_app_details is not available
-            print(f"Note: set_app_details not available: {e}")
+            logger.info("Note: set_app_details not available: %s", e)
     
     def create_order(self, amount: int, currency: str = "INR", user_id: Optional[str] = None) -> Dict:
         """
@@ -75,7 +78,7 @@ class RazorpayService:
             return order
         
         except Exception as e:
-            print(f"❌ Error creating Razorpay order: {str(e)}")
+            logger.error("❌ Error creating Razorpay order: %s", e)
             raise HTTPException(status_code=500, detail=f"Failed to create payment order: {str(e)}")
     
     def verify_payment(self, razorpay_order_id: str, razorpay_payment_id: str, razorpay_signature: str) -> bool:
@@ -102,10 +105,10 @@ class RazorpayService:
             return True
         
         except razorpay.errors.SignatureVerificationError:
-            print(f"❌ Payment signature verification failed")
+            logger.error("❌ Payment signature verification failed")
             return False
         except Exception as e:
-            print(f"❌ Error verifying payment: {str(e)}")
+            logger.error("❌ Error verifying payment: %s", e)
             return False
     
     def get_payment_details(self, payment_id: str) -> Optional[Dict]:
@@ -122,7 +125,7 @@ class RazorpayService:
             payment = self.client.payment.fetch(payment_id)
             return payment
         except Exception as e:
-            print(f"❌ Error fetching payment details: {str(e)}")
+            logger.error("❌ Error fetching payment details: %s", e)
             return None
     
     def get_order_details(self, order_id: str) -> Optional[Dict]:
@@ -139,7 +142,7 @@ class RazorpayService:
             order = self.client.order.fetch(order_id)
             return order
         except Exception as e:
-            print(f"❌ Error fetching order details: {str(e)}")
+            logger.error("❌ Error fetching order details: %s", e)
             return None
 
 
@@ -0,0 +1,112 @@
+"""
+Semantic Cache Service - Reuse LLM results for identical requests.
+
+Sits in front of Gemini calls in the agent graph whose output is a pure
+function of the input (e.g. hashtags for a given tweet). Entries are keyed by
+an exact hash of everything that must match (namespace, platform, content),
+so a repeated request skips the Gemini round-trip entirely.
+
+Features:
+- Exact-key lookups, so results never leak across platforms or inputs
+- TTL expiry and a bounded number of entries (oldest evicted first)
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class SemanticCache:
+    """In-memory TTL cache for generated content."""
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 1000):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long an entry stays valid
+            max_entries: Least recently stored entries are evicted beyond this
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # bucket -> (expires_at, value)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    @staticmethod
+    def make_bucket(*parts: Optional[str]) -> str:
+        """
+        Build a cache key from the parts that must match exactly.
+
+        Args:
+            *parts: Values such as namespace, platform, content
+
+        Returns:
+            str: Stable hash identifying the entry
+        """
+        joined = "\x1f".join(part or "" for part in parts)
+        return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+    def lookup(self, bucket: str) -> Optional[Any]:
+        """
+        Find a cached value.
+
+        Args:
+            bucket: Key from make_bucket()
+
+        Returns:
+            Cached value or None on miss
+        """
+        entry = self._entries.get(bucket)
+        if entry is None:
+            return None
+
+        if entry[0] <= time.monotonic():
+            del self._entries[bucket]
+            return None
+
+        return entry[1]
+
+    def store(self, bucket: str, value: Any) -> None:
+        """
+        Store a value.
+
+        Args:
+            bucket: Key from make_bucket()
+            value: Result to cache
+        """
+        self._entries[bucket] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(bucket)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache size statistics.
+
+        Returns:
+            dict: Number of entries currently held
+        """
+        return {"entries": len(self._entries)}
+
+
+# Singleton instance
+_semantic_cache = None
+
+def get_semantic_cache() -> SemanticCache:
+    """
+    Get or create the singleton SemanticCache instance.
+
+    Returns:
+        Shared SemanticCache instance
+    """
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache()
+    return _semantic_cache
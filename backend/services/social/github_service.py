@@ -1,18 +1,30 @@
 """GitHub OAuth 2.0 service."""
 
+import asyncio
 import os
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import httpx
 from dotenv import load_dotenv
 
+from services.http_client import get_http_client
+import logging
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Parallel per-repo commit requests, kept low to stay under GitHub's secondary rate limit
+MAX_CONCURRENT_REPO_FETCHES = 8
+
+# Longest Retry-After we wait out inline before giving up on the request
+MAX_RETRY_AFTER_SECONDS = 10
+
 
 class GitHubOAuthService:
     """Handle GitHub OAuth 2.0 flow."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.client_id = os.getenv("GITHUB_CLIENT_ID")
         self.client_secret = os.getenv("GITHUB_CLIENT_SECRET")
         self.redirect_uri = os.getenv("GITHUB_REDIRECT_URI", "http://localhost:8000/api/auth/github/callback")
@@ -29,6 +41,34 @@ class GitHubOAuthService:
             "user:email",     # Read user email
             "repo"            # Access repositories (public and private)
         ]
+        
+        # Shared pooled client (keep-alive + HTTP/2) for all GitHub API calls
+        self._client = http_client or get_http_client()
+    
+    async def _get(self, url: str, headers: Dict, params: Optional[Dict] = None) -> httpx.Response:
+        """
+        GET a GitHub API URL, retrying once if rate limited with a short Retry-After.
+        
+        Args:
+            url: API URL
+            headers: Request headers
+            params: Query parameters
+            
+        Returns:
+            httpx.Response: The (possibly retried) response
+        """
+        response = await self._client.get(url, headers=headers, params=params)
+        
+        # Secondary rate limits answer 403/429 with Retry-After (seconds)
+        retry_after = response.headers.get("retry-after")
+        if response.status_code in (403, 429) and retry_after and retry_after.isdigit():
+            delay = int(retry_after)
+            if delay <= MAX_RETRY_AFTER_SECONDS:
+                logger.warning("⚠️  GitHub rate limited, retrying in %ss", delay)
+                await asyncio.sleep(delay)
+                response = await self._client.get(url, headers=headers, params=params)
+        
+        return response
     
     def get_authorization_url(self, state: str) -> tuple[str, str]:
         """
@@ -75,23 +115,22 @@ class GitHubOAuthService:
             "Accept": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=data,
-                headers=headers
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Token exchange failed: {response.text}")
-            
-            result = response.json()
-            
-            # Check for error in response
-            if "error" in result:
-                raise Exception(f"GitHub OAuth error: {result.get('error_description', result['error'])}")
-            
-            return result
+        response = await self._client.post(
+            self.token_url,
+            data=data,
+            headers=headers
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Token exchange failed: {response.text}")
+        
+        result = response.json()
+        
+        # Check for error in response
+        if "error" in result:
+            raise Exception(f"GitHub OAuth error: {result.get('error_description', result['error'])}")
+        
+        return result
     
     async def verify_token(self, access_token: str) -> bool:
         """
@@ -129,19 +168,15 @@ class GitHubOAuthService:
             "Accept": "application/vnd.github.v3+json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.user_url,
-                headers=headers
-            )
-            
-            if response.status_code == 401:
-                raise Exception("GitHub token is invalid or has been revoked. Please reconnect your account.")
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get user info: {response.text}")
-            
-            return response.json()
+        response = await self._get(self.user_url, headers)
+        
+        if response.status_code == 401:
+            raise Exception("GitHub token is invalid or has been revoked. Please reconnect your account.")
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get user info: {response.text}")
+        
+        return response.json()
     
     async def get_repositories(
         self, 
@@ -174,20 +209,15 @@ class GitHubOAuthService:
             "direction": "desc"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.repos_url,
-                headers=headers,
-                params=params
-            )
-            
-            if response.status_code == 401:
-                raise Exception("GitHub token is invalid or has been revoked. Please reconnect your account.")
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get repositories: {response.text}")
-            
-            return response.json()
+        response = await self._get(self.repos_url, headers, params)
+        
+        if response.status_code == 401:
+            raise Exception("GitHub token is invalid or has been revoked. Please reconnect your account.")
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get repositories: {response.text}")
+        
+        return response.json()
     
     async def get_commits(
         self, 
@@ -227,20 +257,15 @@ class GitHubOAuthService:
         
         commits_url = f"https://api.github.com/repos/{owner}/{repo}/commits"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                commits_url,
-                headers=headers,
-                params=params
-            )
-            
-            if response.status_code == 401:
-                raise Exception("GitHub token is invalid or has been revoked. Please reconnect your account.")
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get commits: {response.text}")
-            
-            return response.json()
+        response = await self._get(commits_url, headers, params)
+        
+        if response.status_code == 401:
+            raise Exception("GitHub token is invalid or has been revoked. Please reconnect your account.")
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get commits: {response.text}")
+        
+        return response.json()
     
     async def get_user_commits(
         self,
@@ -264,34 +289,38 @@ class GitHubOAuthService:
         # Get user's repositories
         repos = await self.get_repositories(access_token, per_page=max_repos)
         
-        all_commits = []
         since_str = since.isoformat() if since else None
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REPO_FETCHES)
         
-        # Get commits from each repository
-        for repo in repos[:max_repos]:
+        async def fetch_repo_commits(repo: Dict) -> List[Dict]:
+            repo_name = repo["name"]
             try:
-                repo_name = repo["name"]
-                commits = await self.get_commits(
-                    access_token,
-                    username,
-                    repo_name,
-                    since=since_str,
-                    per_page=30
-                )
-                
-                # Add repository info to each commit
-                for commit in commits:
-                    commit["repository"] = {
-                        "name": repo_name,
-                        "full_name": repo["full_name"],
-                        "language": repo.get("language"),
-                        "description": repo.get("description")
-                    }
-                    all_commits.append(commit)
-                    
+                async with semaphore:
+                    commits = await self.get_commits(
+                        access_token,
+                        username,
+                        repo_name,
+                        since=since_str,
+                        per_page=30
+                    )
             except Exception as e:
-                print(f"Error getting commits from {repo['name']}: {str(e)}")
-                continue
+                logger.error("Error getting commits from %s: %s", repo_name, e)
+                return []
+            
+            # Add repository info to each commit
+            repository = {
+                "name": repo_name,
+                "full_name": repo["full_name"],
+                "language": repo.get("language"),
+                "description": repo.get("description")
+            }
+            for commit in commits:
+                commit["repository"] = repository
+            return commits
+        
+        # Get commits from each repository concurrently
+        results = await asyncio.gather(*(fetch_repo_commits(repo) for repo in repos[:max_repos]))
+        all_commits = [commit for commits in results for commit in commits]
         
         # Sort by date (most recent first)
         all_commits.sort(
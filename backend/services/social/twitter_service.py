@@ -4,18 +4,25 @@ import os
 import secrets
 import hashlib
 import base64
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional
 from datetime import datetime, timedelta
 import httpx
 from dotenv import load_dotenv
 
+from services.http_client import get_http_client
+from metrics import timed
+
 load_dotenv()
 
 
+class RefreshTokenRejectedError(Exception):
+    """Twitter rejected a refresh token (revoked, expired or already rotated)."""
+
+
 class TwitterOAuthService:
     """Handle Twitter OAuth 2.0 with PKCE flow."""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.client_id = os.getenv("TWITTER_CLIENT_ID")
         self.client_secret = os.getenv("TWITTER_CLIENT_SECRET")
         self.redirect_uri = os.getenv("TWITTER_REDIRECT_URI", "http://localhost:8000/api/auth/twitter/callback")
@@ -33,6 +40,9 @@ class TwitterOAuthService:
             "users.read",
             "offline.access"  # For refresh token
         ]
+        
+        # Shared pooled client (keep-alive + HTTP/2) for all Twitter API calls
+        self._client = http_client or get_http_client()
     
     def generate_pkce_pair(self) -> tuple[str, str]:
         """
@@ -80,6 +90,7 @@ class TwitterOAuthService:
         
         return auth_url, code_verifier, state
     
+    @timed("twitter_oauth.exchange_code_for_token")
     async def exchange_code_for_token(
         self, 
         code: str, 
@@ -109,19 +120,19 @@ class TwitterOAuthService:
         else:
             auth = None
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=data,
-                auth=auth,
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Token exchange failed: {response.text}")
-            
-            return response.json()
+        response = await self._client.post(
+            self.token_url,
+            data=data,
+            auth=auth,
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Token exchange failed: {response.text}")
+        
+        return response.json()
     
+    @timed("twitter_oauth.refresh_access_token")
     async def refresh_access_token(self, refresh_token: str) -> Dict:
         """
         Refresh an expired access token.
@@ -143,19 +154,22 @@ class TwitterOAuthService:
         else:
             auth = None
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data=data,
-                auth=auth,
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Token refresh failed: {response.text}")
-            
-            return response.json()
+        response = await self._client.post(
+            self.token_url,
+            data=data,
+            auth=auth,
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        
+        # 400/401 (invalid_grant, invalid_request) means the token will never work again
+        if response.status_code in (400, 401):
+            raise RefreshTokenRejectedError(f"Token refresh rejected: {response.text}")
+        if response.status_code != 200:
+            raise Exception(f"Token refresh failed: {response.text}")
+        
+        return response.json()
     
+    @timed("twitter_oauth.get_user_info")
     async def get_user_info(self, access_token: str) -> Dict:
         """
         Get Twitter user information.
@@ -174,18 +188,18 @@ class TwitterOAuthService:
             "user.fields": "id,name,username,profile_image_url"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.user_url,
-                headers=headers,
-                params=params
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get user info: {response.text}")
-            
-            return response.json()
+        response = await self._client.get(
+            self.user_url,
+            headers=headers,
+            params=params
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get user info: {response.text}")
+        
+        return response.json()
     
+    @timed("twitter_oauth.revoke_token")
     async def revoke_token(self, token: str) -> bool:
         """
         Revoke an access or refresh token.
@@ -206,16 +220,16 @@ class TwitterOAuthService:
         else:
             auth = None
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.revoke_url,
-                data=data,
-                auth=auth,
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
-            
-            return response.status_code == 200
+        response = await self._client.post(
+            self.revoke_url,
+            data=data,
+            auth=auth,
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        
+        return response.status_code == 200
     
+    @timed("twitter_oauth.post_tweet")
     async def post_tweet(self, text: str, access_token: str) -> Dict:
         """
         Post a tweet to Twitter.
@@ -236,29 +250,28 @@ class TwitterOAuthService:
             "text": text
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.twitter.com/2/tweets",
-                headers=headers,
-                json=data
-            )
-            
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Failed to post tweet: {response.text}")
-            
-            result = response.json()
-            tweet_data = result.get("data", {})
-            tweet_id = tweet_data.get("id")
-            
-            # Construct tweet URL
-            url = f"https://twitter.com/i/web/status/{tweet_id}" if tweet_id else None
-            
-            return {
-                "tweet_id": tweet_id,
-                "post_id": tweet_id,
-                "url": url,
-                "raw_response": result
-            }
+        response = await self._client.post(
+            "https://api.twitter.com/2/tweets",
+            headers=headers,
+            json=data
+        )
+        
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Failed to post tweet: {response.text}")
+        
+        result = response.json()
+        tweet_data = result.get("data", {})
+        tweet_id = tweet_data.get("id")
+        
+        # Construct tweet URL
+        url = f"https://twitter.com/i/web/status/{tweet_id}" if tweet_id else None
+        
+        return {
+            "tweet_id": tweet_id,
+            "post_id": tweet_id,
+            "url": url,
+            "raw_response": result
+        }
     
     def calculate_token_expiry(self, expires_in: int) -> datetime:
         """
@@ -273,12 +286,13 @@ class TwitterOAuthService:
         from datetime import timezone
         return datetime.now(timezone.utc) + timedelta(seconds=expires_in)
     
-    def is_token_expired(self, expires_at: datetime) -> bool:
+    def is_token_expired(self, expires_at: datetime, buffer_minutes: int = 5) -> bool:
         """
         Check if token is expired.
         
         Args:
             expires_at: Token expiration datetime
+            buffer_minutes: Treat the token as expired this many minutes early
             
         Returns:
             bool: True if expired
@@ -292,9 +306,10 @@ class TwitterOAuthService:
         if expires_at.tzinfo is None:
             expires_at = expires_at.replace(tzinfo=timezone.utc)
         
-        # Add 5 minute buffer
-        return now >= (expires_at - timedelta(minutes=5))
+        # Add safety buffer
+        return now >= (expires_at - timedelta(minutes=buffer_minutes))
     
+    @timed("twitter_oauth.get_user_tweets")
     async def get_user_tweets(
         self, 
         access_token: str, 
@@ -317,41 +332,41 @@ class TwitterOAuthService:
         }
         
         # First, get the user's Twitter ID
-        async with httpx.AsyncClient() as client:
-            user_response = await client.get(
-                self.user_url,
-                headers=headers,
-                params={"user.fields": "id,username"}
-            )
-            
-            if user_response.status_code != 200:
-                raise Exception(f"Failed to get user info: {user_response.text}")
-            
-            user_data = user_response.json()
-            user_id = user_data["data"]["id"]
-            
-            # Now fetch tweets using the user ID
-            params = {
-                "max_results": min(max_results, 100),  # Twitter API max is 100
-                "tweet.fields": "created_at,public_metrics,entities",
-                "expansions": "author_id",
-                "user.fields": "id,name,username"
-            }
-            
-            if pagination_token:
-                params["pagination_token"] = pagination_token
-            
-            response = await client.get(
-                f"https://api.twitter.com/2/users/{user_id}/tweets",
-                headers=headers,
-                params=params
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get user tweets: {response.text}")
-            
-            return response.json()
+        user_response = await self._client.get(
+            self.user_url,
+            headers=headers,
+            params={"user.fields": "id,username"}
+        )
+        
+        if user_response.status_code != 200:
+            raise Exception(f"Failed to get user info: {user_response.text}")
+        
+        user_data = user_response.json()
+        user_id = user_data["data"]["id"]
+        
+        # Now fetch tweets using the user ID
+        params = {
+            "max_results": min(max_results, 100),  # Twitter API max is 100
+            "tweet.fields": "created_at,public_metrics,entities",
+            "expansions": "author_id",
+            "user.fields": "id,name,username"
+        }
+        
+        if pagination_token:
+            params["pagination_token"] = pagination_token
+        
+        response = await self._client.get(
+            f"https://api.twitter.com/2/users/{user_id}/tweets",
+            headers=headers,
+            params=params
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get user tweets: {response.text}")
+        
+        return response.json()
     
+    @timed("twitter_oauth.get_tweet_metrics")
     async def get_tweet_metrics(self, access_token: str, tweet_ids: list[str]) -> Dict:
         """
         Get engagement metrics for specific tweets.
@@ -377,35 +392,32 @@ class TwitterOAuthService:
             "tweet.fields": "public_metrics,created_at"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.twitter.com/2/tweets",
-                headers=headers,
-                params=params
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get tweet metrics: {response.text}")
-            
-            return response.json()
+        response = await self._client.get(
+            "https://api.twitter.com/2/tweets",
+            headers=headers,
+            params=params
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get tweet metrics: {response.text}")
+        
+        return response.json()
     
-    async def batch_fetch_all_tweets(
-        self, 
-        access_token: str, 
+    async def iter_tweet_pages(
+        self,
+        access_token: str,
         limit: int = 20
-    ) -> Dict:
+    ) -> AsyncIterator[Dict]:
         """
-        Fetch multiple pages of tweets up to the specified limit.
+        Yield pages of tweets until the specified limit is reached.
         
         Args:
             access_token: Valid access token
             limit: Maximum number of tweets to fetch (default 20)
             
-        Returns:
-            dict: All tweets data with combined results
+        Yields:
+            dict: One non-empty API page (data, includes, meta)
         """
-        all_tweets = []
-        all_users = []
         pagination_token = None
         total_fetched = 0
         
@@ -421,22 +433,40 @@ class TwitterOAuthService:
                 pagination_token=pagination_token
             )
             
-            # Extract data
             tweets = response.get("data", [])
-            users = response.get("includes", {}).get("users", [])
-            meta = response.get("meta", {})
-            
             if not tweets:
                 break  # No more tweets
             
-            all_tweets.extend(tweets)
-            all_users.extend(users)
             total_fetched += len(tweets)
+            yield response
             
             # Check if there's more data
-            pagination_token = meta.get("next_token")
+            pagination_token = response.get("meta", {}).get("next_token")
             if not pagination_token:
                 break  # No more pages
+    
+    async def batch_fetch_all_tweets(
+        self, 
+        access_token: str, 
+        limit: int = 20
+    ) -> Dict:
+        """
+        Fetch multiple pages of tweets up to the specified limit.
+        
+        Args:
+            access_token: Valid access token
+            limit: Maximum number of tweets to fetch (default 20)
+            
+        Returns:
+            dict: All tweets data with combined results
+        """
+        all_tweets = []
+        all_users = []
+        
+        async for page in self.iter_tweet_pages(access_token, limit):
+            all_tweets.extend(page["data"])
+            all_users.extend(page.get("includes", {}).get("users", []))
+        total_fetched = len(all_tweets)
         
         return {
             "data": all_tweets,
@@ -33,7 +33,7 @@ class SubscriptionService:
             return self.create_free_subscription(user_id)
         
         except Exception as e:
-            logger.error(f"Error getting subscription: {str(e)}")
+            logger.error("Error getting subscription: %s", e)
             return None
     
     def create_free_subscription(self, user_id: str) -> Dict:
@@ -60,13 +60,13 @@ class SubscriptionService:
             response = supabase_service.client.table("subscriptions").insert(subscription_data).execute()
             
             if response.data and len(response.data) > 0:
-                logger.info(f"✅ Created free subscription for user {user_id}")
+                logger.info("✅ Created free subscription for user %s", user_id)
                 return response.data[0]
             
             raise Exception("Failed to create subscription")
         
         except Exception as e:
-            logger.error(f"Error creating free subscription: {str(e)}")
+            logger.error("Error creating free subscription: %s", e)
             # If subscription already exists, return it
             return self.get_user_subscription(user_id)
     
@@ -93,7 +93,7 @@ class SubscriptionService:
             # Check if period has expired (reset monthly)
             period_end = subscription.get("current_period_end")
             if period_end:
-                end_date = datetime.fromisoformat(period_end.replace('Z', '+00:00'))
+                end_date = datetime.fromisoformat(period_end)
                 if datetime.utcnow() > end_date:
                     # Reset monthly limit
                     self.reset_monthly_limit(user_id)
@@ -113,7 +113,7 @@ class SubscriptionService:
             return True, f"{posts_limit - posts_used} posts remaining this month"
         
         except Exception as e:
-            logger.error(f"Error checking post limit: {str(e)}")
+            logger.error("Error checking post limit: %s", e)
             return False, "Error checking subscription status"
     
     def increment_post_count(self, user_id: str) -> bool:
@@ -135,7 +135,7 @@ class SubscriptionService:
             # Check if period expired (reset first)
             period_end = subscription.get("current_period_end")
             if period_end:
-                end_date = datetime.fromisoformat(period_end.replace('Z', '+00:00'))
+                end_date = datetime.fromisoformat(period_end)
                 if datetime.utcnow() > end_date:
                     self.reset_monthly_limit(user_id)
                     subscription = self.get_user_subscription(user_id)
@@ -155,11 +155,11 @@ class SubscriptionService:
                 "updated_at": datetime.utcnow().isoformat()
             }).eq("user_id", user_id).execute()
             
-            logger.info(f"✅ Incremented post count for user {user_id}: {new_count}")
+            logger.info("✅ Incremented post count for user %s: %s", user_id, new_count)
             return True
         
         except Exception as e:
-            logger.error(f"Error incrementing post count: {str(e)}")
+            logger.error("Error incrementing post count: %s", e)
             return False
     
     def upgrade_to_pro(self, user_id: str, razorpay_payment_id: str, razorpay_order_id: str) -> bool:
@@ -194,13 +194,13 @@ class SubscriptionService:
             response = supabase_service.client.table("subscriptions").update(update_data).eq("user_id", user_id).execute()
             
             if response.data:
-                logger.info(f"✅ Upgraded user {user_id} to Pro")
+                logger.info("✅ Upgraded user %s to Pro", user_id)
                 return True
             
             return False
         
         except Exception as e:
-            logger.error(f"Error upgrading to Pro: {str(e)}")
+            logger.error("Error upgrading to Pro: %s", e)
             return False
     
     def reset_monthly_limit(self, user_id: str) -> bool:
@@ -235,11 +235,11 @@ class SubscriptionService:
             
             supabase_service.client.table("subscriptions").update(update_data).eq("user_id", user_id).execute()
             
-            logger.info(f"✅ Reset monthly limit for user {user_id}")
+            logger.info("✅ Reset monthly limit for user %s", user_id)
             return True
         
         except Exception as e:
-            logger.error(f"Error resetting monthly limit: {str(e)}")
+            logger.error("Error resetting monthly limit: %s", e)
             return False
     
     def get_subscription_status(self, user_id: str) -> Dict:
@@ -282,7 +282,7 @@ class SubscriptionService:
             }
         
         except Exception as e:
-            logger.error(f"Error getting subscription status: {str(e)}")
+            logger.error("Error getting subscription status: %s", e)
             return {
                 "plan_type": "free",
                 "posts_used": 0,
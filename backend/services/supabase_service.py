@@ -2,15 +2,38 @@
 Supabase service for database operations and JWT verification
 """
 
+import asyncio
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from supabase import create_client, acreate_client, Client, AsyncClient
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
+from metrics import timed
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Verified JWT claims are reused for a few seconds to skip repeated decoding
+JWT_CACHE_TTL_SECONDS = 30
+JWT_CACHE_MAX_ENTRIES = 10000
+
+# Connected-account rows are reused briefly; writes through this service
+# invalidate them. Missing rows are never cached, and token refreshes and
+# saves read fresh (see get_platform_connection).
+CONNECTION_CACHE_TTL_SECONDS = 30
+CONNECTION_CACHE_MAX_ENTRIES = 10000
+
+# Columns returned by get_connected_accounts (never tokens)
+CONNECTION_SUMMARY_COLUMNS = "platform, platform_username, is_active, connected_at"
+
+# Columns returned by get_user_posts (the PostHistoryItem fields)
+POST_HISTORY_COLUMNS = "id, platform, user_prompt, generated_content, hashtags, platform_post_id, platform_post_url, status, created_at"
+
 class SupabaseService:
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL")
@@ -21,11 +44,84 @@ class SupabaseService:
             raise ValueError("Missing required Supabase environment variables")
         
         self.client: Client = create_client(self.url, self.service_key)
+        
+        # Async client for request-path queries (shares one pooled HTTP connection);
+        # created lazily because it has to be built inside the event loop
+        self._async_client: Optional[AsyncClient] = None
+        self._async_client_lock = asyncio.Lock()
+        
+        # sha256(token) prefix -> (cached_until, payload); only successful verifications
+        self._jwt_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._jwt_cache_lock = threading.Lock()
+        
+        # user_id -> (expires_at, summary rows) and (user_id, platform) -> (expires_at, row)
+        self._accounts_cache: Dict[str, tuple] = {}
+        self._connection_cache: Dict[tuple, tuple] = {}
+    
+    @staticmethod
+    def _cache_get(cache: Dict, key: Any) -> tuple:
+        """
+        Look up a live cache entry, returning (hit, value)
+        """
+        entry = cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+    
+    @staticmethod
+    def _cache_set(cache: Dict, key: Any, value: Any) -> None:
+        """
+        Store a cache entry, evicting the oldest one when full
+        """
+        cache.pop(key, None)
+        cache[key] = (time.monotonic() + CONNECTION_CACHE_TTL_SECONDS, value)
+        if len(cache) > CONNECTION_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+    
+    @staticmethod
+    def _expiry_epoch(expires_at: Any) -> Optional[int]:
+        """
+        Convert a token expiry (datetime or ISO string) to UTC epoch seconds for storage
+        """
+        if not expires_at:
+            return None
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at)
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return int(expires_at.timestamp())
+    
+    def _invalidate_connections(self, user_id: str, platform: str) -> None:
+        """
+        Drop cached connection rows for a user after a write
+        """
+        self._accounts_cache.pop(user_id, None)
+        self._connection_cache.pop((user_id, platform), None)
+    
+    async def _get_async_client(self) -> AsyncClient:
+        """
+        Get the shared async Supabase client, creating it on first use
+        """
+        if self._async_client is None:
+            # Concurrent first requests would each build (and leak) a client
+            async with self._async_client_lock:
+                if self._async_client is None:
+                    self._async_client = await acreate_client(self.url, self.service_key)
+        return self._async_client
     
     def verify_jwt_token(self, token: str) -> Dict[str, Any]:
         """
         Verify Supabase JWT token and return user data
         """
+        cache_key = hashlib.sha256(token.encode()).digest()[:16]
+        now = time.time()
+        
+        with self._jwt_cache_lock:
+            cached = self._jwt_cache.get(cache_key)
+            if cached and cached[0] > now:
+                self._jwt_cache.move_to_end(cache_key)
+                return cached[1]
+        
         try:
             # Decode JWT with audience validation
             # Supabase uses "authenticated" as the default audience
@@ -42,95 +138,158 @@ class SupabaseService:
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token: missing user ID"
                 )
+            
+            # Never cache past the token's own expiry
+            cached_until = min(now + JWT_CACHE_TTL_SECONDS, payload.get("exp", now))
+            if cached_until > now:
+                with self._jwt_cache_lock:
+                    self._jwt_cache[cache_key] = (cached_until, payload)
+                    self._jwt_cache.move_to_end(cache_key)
+                    if len(self._jwt_cache) > JWT_CACHE_MAX_ENTRIES:
+                        self._jwt_cache.popitem(last=False)
+            
             return payload
         except JWTError as e:
-            logger.error(f"JWT verification failed: {e}")
+            logger.error("JWT verification failed: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
     
-    def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+    @timed("supabase.get_user_profile")
+    async def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Get user profile from Supabase
         """
         try:
-            response = self.client.table("profiles").select("*").eq("id", user_id).execute()
+            client = await self._get_async_client()
+            response = await client.table("profiles").select("*").eq("id", user_id).execute()
             if response.data and len(response.data) > 0:
                 return response.data[0]
             return None
         except Exception as e:
-            logger.error(f"Error fetching user profile: {e}")
+            logger.error("Error fetching user profile: %s", e)
             return None
     
-    def get_connected_accounts(self, user_id: str) -> List[Dict[str, Any]]:
+    @timed("supabase.get_connected_accounts")
+    async def get_connected_accounts(self, user_id: str) -> List[Dict[str, Any]]:
         """
-        Get user's connected social media accounts
+        Get user's connected social media accounts (public fields only, no tokens)
         """
+        hit, accounts = self._cache_get(self._accounts_cache, user_id)
+        if hit:
+            return accounts
+        
         try:
-            response = self.client.table("connected_accounts").select("*").eq("user_id", user_id).execute()
-            return response.data or []
+            client = await self._get_async_client()
+            response = await client.table("connected_accounts").select(CONNECTION_SUMMARY_COLUMNS).eq("user_id", user_id).execute()
+            accounts = response.data or []
+            self._cache_set(self._accounts_cache, user_id, accounts)
+            return accounts
         except Exception as e:
-            logger.error(f"Error fetching connected accounts: {e}")
+            logger.error("Error fetching connected accounts: %s", e)
             return []
     
-    def get_platform_connection(self, user_id: str, platform: str) -> Optional[Dict[str, Any]]:
+    @timed("supabase.get_platform_connection")
+    async def get_platform_connection(self, user_id: str, platform: str, fresh: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get specific platform connection for user
+        
+        Rows are cached per worker for a few seconds. Pass fresh=True where a
+        stale row would do harm (spending a refresh token another worker may
+        have rotated, choosing insert vs update).
         """
+        if not fresh:
+            hit, account = self._cache_get(self._connection_cache, (user_id, platform))
+            if hit:
+                return account
+        
         try:
-            response = self.client.table("connected_accounts").select("*").eq("user_id", user_id).eq("platform", platform).execute()
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return None
+            client = await self._get_async_client()
+            response = await client.table("connected_accounts").select("*").eq("user_id", user_id).eq("platform", platform).execute()
+            # expires_at_epoch is stored at write time, so the row is used as-is
+            account = response.data[0] if response.data else None
+            # Only cache real rows, so a new connection shows up immediately
+            if account is not None:
+                self._cache_set(self._connection_cache, (user_id, platform), account)
+            return account
         except Exception as e:
-            logger.error(f"Error fetching platform connection: {e}")
+            logger.error("Error fetching platform connection: %s", e)
             return None
     
-    def get_connected_account(self, user_id: str, platform: str) -> Optional[Dict[str, Any]]:
+    async def get_connected_account(self, user_id: str, platform: str) -> Optional[Dict[str, Any]]:
         """
         Get specific platform connection for user (alias for get_platform_connection)
         """
-        return self.get_platform_connection(user_id, platform)
+        return await self.get_platform_connection(user_id, platform)
     
-    def save_connected_account(self, account_data: Dict[str, Any]) -> bool:
+    @timed("supabase.save_connected_account")
+    async def save_connected_account(self, account_data: Dict[str, Any]) -> bool:
         """
         Save or update connected account
         """
         try:
+            # Store the expiry as epoch seconds too, so readers never parse it
+            account_data = {**account_data, "expires_at_epoch": self._expiry_epoch(account_data.get("expires_at"))}
+            
             # Check if account already exists
-            existing = self.get_platform_connection(account_data["user_id"], account_data["platform"])
+            existing = await self.get_platform_connection(account_data["user_id"], account_data["platform"], fresh=True)
+            client = await self._get_async_client()
             
             if existing:
                 # Update existing account
-                response = self.client.table("connected_accounts").update(account_data).eq("id", existing["id"]).execute()
+                response = await client.table("connected_accounts").update(account_data).eq("id", existing["id"]).execute()
             else:
                 # Insert new account
-                response = self.client.table("connected_accounts").insert(account_data).execute()
+                response = await client.table("connected_accounts").insert(account_data).execute()
             
+            self._invalidate_connections(account_data["user_id"], account_data["platform"])
             return True
         except Exception as e:
-            logger.error(f"Error saving connected account: {e}")
+            logger.error("Error saving connected account: %s", e)
             return False
     
-    def delete_connected_account(self, user_id: str, platform: str) -> bool:
+    @timed("supabase.delete_connected_account")
+    async def delete_connected_account(self, user_id: str, platform: str) -> bool:
         """
         Delete connected account
         """
         try:
-            response = self.client.table("connected_accounts").delete().eq("user_id", user_id).eq("platform", platform).execute()
+            client = await self._get_async_client()
+            response = await client.table("connected_accounts").delete().eq("user_id", user_id).eq("platform", platform).execute()
+            self._invalidate_connections(user_id, platform)
             return True
         except Exception as e:
-            logger.error(f"Error deleting connected account: {e}")
+            logger.error("Error deleting connected account: %s", e)
             return False
     
-    def update_platform_tokens(self, user_id: str, platform: str, access_token: str, refresh_token: str, expires_at: Any) -> bool:
+    @timed("supabase.get_expiring_connections")
+    async def get_expiring_connections(self, platform: str, before: str) -> List[Dict[str, Any]]:
+        """
+        Get active connections whose tokens expire before the given ISO timestamp
+        """
+        try:
+            client = await self._get_async_client()
+            response = await (
+                client.table("connected_accounts")
+                .select("*")
+                .eq("platform", platform)
+                .eq("is_active", True)
+                .lt("expires_at", before)
+                .not_.is_("refresh_token", "null")
+                .execute()
+            )
+            return response.data or []
+        except Exception as e:
+            logger.error("Error fetching expiring connections: %s", e)
+            return []
+    
+    @timed("supabase.update_platform_tokens")
+    async def update_platform_tokens(self, user_id: str, platform: str, access_token: str, refresh_token: str, expires_at: Any) -> bool:
         """
         Update access and refresh tokens for a connected account
         """
         try:
-            from datetime import datetime
-            
             # Convert datetime to ISO string if needed
             if isinstance(expires_at, datetime):
                 expires_at_str = expires_at.isoformat()
@@ -141,42 +300,63 @@ class SupabaseService:
                 "access_token": access_token,
                 "refresh_token": refresh_token,
                 "expires_at": expires_at_str,
+                "expires_at_epoch": self._expiry_epoch(expires_at),
                 "is_active": True
             }
             
-            response = self.client.table("connected_accounts").update(update_data).eq("user_id", user_id).eq("platform", platform).execute()
+            client = await self._get_async_client()
+            response = await client.table("connected_accounts").update(update_data).eq("user_id", user_id).eq("platform", platform).execute()
+            self._invalidate_connections(user_id, platform)
+            return True
+        except Exception as e:
+            logger.error("Error updating platform tokens: %s", e)
+            return False
+    
+    @timed("supabase.deactivate_connection")
+    async def deactivate_connection(self, user_id: str, platform: str) -> bool:
+        """
+        Mark a connection inactive and drop its refresh token (the user has to reconnect)
+        """
+        try:
+            client = await self._get_async_client()
+            response = await client.table("connected_accounts").update({"is_active": False, "refresh_token": None}).eq("user_id", user_id).eq("platform", platform).execute()
+            self._invalidate_connections(user_id, platform)
             return True
         except Exception as e:
-            logger.error(f"Error updating platform tokens: {e}")
+            logger.error("Error deactivating connection: %s", e)
             return False
     
-    def save_post(self, post_data: Dict[str, Any]) -> Optional[str]:
+    @timed("supabase.save_post")
+    async def save_post(self, post_data: Dict[str, Any]) -> Optional[str]:
         """
         Save post to database
         """
         try:
-            response = self.client.table("posts").insert(post_data).execute()
+            client = await self._get_async_client()
+            response = await client.table("posts").insert(post_data).execute()
             if response.data and len(response.data) > 0:
                 return response.data[0]["id"]
             return None
         except Exception as e:
-            logger.error(f"Error saving post: {e}")
+            logger.error("Error saving post: %s", e)
             return None
     
-    def get_user_posts(self, user_id: str, platform: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    @timed("supabase.get_user_posts")
+    async def get_user_posts(self, user_id: str, platform: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Get user's posts
         """
         try:
-            query = self.client.table("posts").select("*").eq("user_id", user_id)
+            client = await self._get_async_client()
+            query = client.table("posts").select(POST_HISTORY_COLUMNS).eq("user_id", user_id)
             
             if platform:
                 query = query.eq("platform", platform)
             
-            response = query.order("created_at", desc=True).limit(limit).execute()
+            response = await query.order("created_at", desc=True).limit(limit).execute()
             return response.data or []
         except Exception as e:
-            logger.error(f"Error fetching user posts: {e}")
+            logger.error("Error fetching user posts: %s", e)
             return []
 
 # Global instance
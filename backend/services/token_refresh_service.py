@@ -0,0 +1,193 @@
+"""
+Token Refresh Service - Proactively refresh OAuth tokens before they expire.
+
+Runs as a background task so /api/post rarely has to refresh a Twitter token
+inline (an extra HTTPS round-trip on the user-visible path). post_content keeps
+its inline refresh as a fallback for tokens that slip through.
+
+Twitter rotates refresh tokens, so every refresh (background or inline) goes
+through refresh_twitter_token: one in-flight refresh per user per worker,
+serialized across workers by a Redis lock, re-reading the row under the lock.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from services.supabase_service import supabase_service
+from services.social.twitter_service import RefreshTokenRejectedError, TwitterOAuthService
+
+logger = logging.getLogger(__name__)
+
+# Check every minute, refresh anything expiring in the next 10 minutes
+REFRESH_INTERVAL_SECONDS = 60
+REFRESH_WINDOW_SECONDS = 600
+
+# Per-user refresh lock (SET NX with expiry): held across read, refresh and write
+REFRESH_LOCK_TIMEOUT_SECONDS = 30
+REFRESH_LOCK_WAIT_SECONDS = 15
+
+
+class TokenRefreshService:
+    """Background refresher for platform access tokens."""
+
+    def __init__(self, twitter_oauth: TwitterOAuthService, redis_url: str = None):
+        """
+        Initialize the refresher.
+
+        Args:
+            twitter_oauth: Twitter OAuth service used to refresh tokens
+            redis_url: Redis URL used to elect one worker per cycle (optional)
+        """
+        self.twitter_oauth = twitter_oauth
+        self._redis = None
+
+        # user_id -> in-flight refresh task in this worker
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+        if redis_url:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(redis_url, decode_responses=True)
+
+    async def run_forever(self, interval_seconds: int = REFRESH_INTERVAL_SECONDS) -> None:
+        """
+        Refresh expiring tokens every interval until cancelled.
+
+        Args:
+            interval_seconds: Seconds between refresh cycles
+        """
+        while True:
+            try:
+                # One worker scans per cycle; per-user locks guard the refreshes themselves
+                if await self._acquire_cycle(interval_seconds):
+                    await self.refresh_expiring_twitter_tokens()
+            except Exception as e:
+                logger.error("Token refresh cycle failed: %s", e)
+
+            await asyncio.sleep(interval_seconds)
+
+    async def refresh_expiring_twitter_tokens(self) -> Dict[str, int]:
+        """
+        Refresh all active Twitter tokens that expire within the refresh window.
+
+        Returns:
+            dict: Counts of refreshed and failed accounts
+        """
+        cutoff = datetime.now(timezone.utc) + timedelta(seconds=REFRESH_WINDOW_SECONDS)
+        accounts = await supabase_service.get_expiring_connections("twitter", cutoff.isoformat())
+
+        refreshed = 0
+        failed = 0
+        for account in accounts:
+            try:
+                # Failures are logged by the task's done callback
+                await self.refresh_twitter_token(account["user_id"], account.get("expires_at"))
+                refreshed += 1
+            except Exception:
+                failed += 1
+
+        if accounts:
+            logger.info("🔄 Refreshed %s Twitter tokens (%s failed)", refreshed, failed)
+
+        return {"refreshed": refreshed, "failed": failed}
+
+    def refresh_twitter_token(self, user_id: str, seen_expires_at: Optional[str]) -> asyncio.Task:
+        """
+        Start a Twitter token refresh for a user, or join the one already running.
+
+        Await the result through asyncio.shield if the caller can be cancelled,
+        so a dropped request doesn't cancel a refresh other callers share.
+
+        Args:
+            user_id: User whose token to refresh
+            seen_expires_at: expires_at of the row the caller decided on; if the
+                stored row has moved on, the refresh is skipped
+
+        Returns:
+            Task resolving to a current access token
+        """
+        # The lookup and insert have no await in between, so no lock is needed
+        task = self._in_flight.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._refresh_twitter_token(user_id, seen_expires_at))
+            self._in_flight[user_id] = task
+            task.add_done_callback(lambda t: self._on_refresh_done(user_id, t))
+        return task
+
+    async def _refresh_twitter_token(self, user_id: str, seen_expires_at: Optional[str]) -> str:
+        """Refresh and store a user's Twitter tokens under the per-user lock."""
+        async with self._user_lock(user_id):
+            # Re-read under the lock: another worker may have spent the refresh token
+            account = await supabase_service.get_platform_connection(user_id, "twitter", fresh=True)
+            if not account or not account.get("refresh_token"):
+                raise ValueError("No Twitter refresh token stored")
+            if account.get("expires_at") != seen_expires_at:
+                return account["access_token"]
+
+            try:
+                token_response = await self.twitter_oauth.refresh_access_token(account["refresh_token"])
+            except RefreshTokenRejectedError:
+                # Dead refresh token: take it out of the refresh query instead of
+                # retrying it against Twitter every cycle
+                await supabase_service.deactivate_connection(user_id, "twitter")
+                raise
+            expires_at = self.twitter_oauth.calculate_token_expiry(token_response.get("expires_in", 7200))
+
+            await supabase_service.update_platform_tokens(
+                user_id,
+                "twitter",
+                token_response["access_token"],
+                token_response.get("refresh_token", account["refresh_token"]),
+                expires_at
+            )
+            logger.info("✅ Token refreshed successfully for user %s", user_id)
+            return token_response["access_token"]
+
+    def _on_refresh_done(self, user_id: str, task: asyncio.Task) -> None:
+        """Forget a finished refresh and log its failure (also for unawaited refreshes)."""
+        self._in_flight.pop(user_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("⚠️  Token refresh failed for user %s: %s", user_id, task.exception())
+
+    def _user_lock(self, user_id: str):
+        """Cross-worker lock for one user's refresh (no-op without Redis, where the server runs one worker)."""
+        if self._redis is None:
+            return contextlib.nullcontext()
+
+        return self._redis.lock(
+            f"token_refresh:twitter:{user_id}",
+            timeout=REFRESH_LOCK_TIMEOUT_SECONDS,
+            blocking_timeout=REFRESH_LOCK_WAIT_SECONDS
+        )
+
+    async def _acquire_cycle(self, interval_seconds: int) -> bool:
+        """Claim this refresh cycle (always True without Redis, where the server runs one worker)."""
+        if self._redis is None:
+            return True
+
+        return bool(await self._redis.set(
+            "token_refresh:lock", "1", nx=True, ex=max(interval_seconds - 5, 1)
+        ))
+
+
+# Singleton instance
+_token_refresh_service = None
+
+def get_token_refresh_service(twitter_oauth: TwitterOAuthService) -> TokenRefreshService:
+    """
+    Get or create the singleton TokenRefreshService instance.
+
+    Args:
+        twitter_oauth: Twitter OAuth service used on first creation
+
+    Returns:
+        Shared TokenRefreshService instance
+    """
+    global _token_refresh_service
+    if _token_refresh_service is None:
+        _token_refresh_service = TokenRefreshService(twitter_oauth, os.getenv("REDIS_URL"))
+    return _token_refresh_service
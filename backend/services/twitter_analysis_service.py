@@ -1,11 +1,20 @@
 """Twitter Analysis Service - Analyze tweet style and patterns."""
 
+import asyncio
 import re
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
 from collections import Counter
 from services.supabase_service import supabase_service
 from services.twitter_data_service import twitter_data_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Style profiles only change when tweets are re-analyzed; keep them in memory briefly
+STYLE_PROFILE_CACHE_TTL_SECONDS = 300
+STYLE_PROFILE_CACHE_MAX_ENTRIES = 10000
 
 
 class TwitterAnalysisService:
@@ -14,6 +23,10 @@ class TwitterAnalysisService:
     def __init__(self):
         self.supabase = supabase_service.client
         
+        # user_id -> (expires_at, profile), and user_id -> in-flight generation
+        self._profile_cache: Dict[str, tuple] = {}
+        self._generating: Dict[str, asyncio.Task] = {}
+        
         # Common stop words to exclude from topic extraction
         self.stop_words = {
             'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
@@ -301,7 +314,7 @@ class TwitterAnalysisService:
             if posted_at:
                 try:
                     if isinstance(posted_at, str):
-                        dt = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
+                        dt = datetime.fromisoformat(posted_at)
                     else:
                         dt = posted_at
                     top_hours.append(dt.hour)
@@ -359,19 +372,19 @@ class TwitterAnalysisService:
             dict: Complete style profile
         """
         try:
-            print(f"\n📊 Generating style profile for user {user_id}...")
+            logger.info("📊 Generating style profile for user %s...", user_id)
             
             # Get user's tweets from database
             tweets = await twitter_data_service.get_user_tweets_from_db(user_id, limit=200)
             
             if not tweets:
-                print("⚠️  No tweets found for analysis")
+                logger.warning("⚠️  No tweets found for analysis")
                 return {
                     "error": "No tweets available for analysis",
                     "user_id": user_id
                 }
             
-            print(f"   Analyzing {len(tweets)} tweets...")
+            logger.info("   Analyzing %s tweets...", len(tweets))
             
             # Run all analyses
             length_stats = self.analyze_tweet_length(tweets)
@@ -397,38 +410,37 @@ class TwitterAnalysisService:
             }
             
             # Save to database
-            print("   💾 Saving style profile to database...")
+            logger.info("   💾 Saving style profile to database...")
             
             # Check if profile exists
-            existing = self.supabase.table("twitter_style_profile")\
+            query = self.supabase.table("twitter_style_profile")\
                 .select("id")\
-                .eq("user_id", user_id)\
-                .execute()
+                .eq("user_id", user_id)
+            existing = await asyncio.to_thread(query.execute)
             
             if existing.data:
                 # Update existing profile
-                response = self.supabase.table("twitter_style_profile")\
+                query = self.supabase.table("twitter_style_profile")\
                     .update(profile)\
-                    .eq("user_id", user_id)\
-                    .execute()
+                    .eq("user_id", user_id)
+                response = await asyncio.to_thread(query.execute)
             else:
                 # Insert new profile
-                response = self.supabase.table("twitter_style_profile")\
-                    .insert(profile)\
-                    .execute()
+                query = self.supabase.table("twitter_style_profile")\
+                    .insert(profile)
+                response = await asyncio.to_thread(query.execute)
             
-            print(f"✅ Style profile generated successfully!")
-            print(f"   - Tone: {tone}")
-            print(f"   - Avg length: {length_stats['average']} chars")
-            print(f"   - Uses emojis: {emoji_stats['percentage']}%")
-            print(f"   - Top topics: {', '.join(topics[:3])}")
+            logger.info("✅ Style profile generated successfully!")
+            logger.info("   - Tone: %s", tone)
+            logger.info("   - Avg length: %s chars", length_stats['average'])
+            logger.info("   - Uses emojis: %s%%", emoji_stats['percentage'])
+            logger.info("   - Top topics: %s", ', '.join(topics[:3]))
             
+            self._cache_profile(user_id, profile)
             return profile
             
         except Exception as e:
-            print(f"❌ Error generating style profile: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error generating style profile: %s", e)
             return {"error": str(e)}
     
     async def get_style_profile(self, user_id: str) -> Optional[Dict]:
@@ -441,17 +453,57 @@ class TwitterAnalysisService:
         Returns:
             dict: Style profile or None
         """
+        entry = self._profile_cache.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        
         try:
-            response = self.supabase.table("twitter_style_profile")\
+            query = self.supabase.table("twitter_style_profile")\
                 .select("*")\
-                .eq("user_id", user_id)\
-                .execute()
+                .eq("user_id", user_id)
+            response = await asyncio.to_thread(query.execute)
             
-            return response.data[0] if response.data else None
+            profile = response.data[0] if response.data else None
+            if profile:
+                self._cache_profile(user_id, profile)
+            return profile
         except Exception as e:
-            print(f"❌ Error getting style profile: {e}")
+            logger.error("❌ Error getting style profile: %s", e)
             return None
 
+    
+    async def get_or_generate_style_profile(self, user_id: str) -> Dict:
+        """
+        Get the style profile, generating it if the user has none yet.
+        
+        Concurrent cold reads for the same user share one generation.
+        
+        Args:
+            user_id: User's UUID
+            
+        Returns:
+            dict: Style profile, or {"error": ...} if it can't be generated
+        """
+        profile = await self.get_style_profile(user_id)
+        if profile:
+            return profile
+        
+        task = self._generating.get(user_id)
+        if task is None:
+            logger.info("📊 No style profile found, generating...")
+            task = asyncio.create_task(self.generate_style_profile(user_id))
+            self._generating[user_id] = task
+            task.add_done_callback(lambda _: self._generating.pop(user_id, None))
+        
+        return await asyncio.shield(task)
+    
+    def _cache_profile(self, user_id: str, profile: Dict) -> None:
+        """Store a profile in the in-memory cache, evicting the oldest entry when full."""
+        self._profile_cache.pop(user_id, None)
+        self._profile_cache[user_id] = (time.monotonic() + STYLE_PROFILE_CACHE_TTL_SECONDS, profile)
+        if len(self._profile_cache) > STYLE_PROFILE_CACHE_MAX_ENTRIES:
+            del self._profile_cache[next(iter(self._profile_cache))]
+
 
 # Create singleton instance
 twitter_analysis_service = TwitterAnalysisService()
@@ -1,9 +1,13 @@
 """Twitter Data Service - Handle storing and retrieving Twitter data."""
 
+import asyncio
 import re
 from typing import Dict, List, Optional
 from datetime import datetime
 from services.supabase_service import supabase_service
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class TwitterDataService:
@@ -54,59 +58,71 @@ class TwitterDataService:
             dict: Summary with counts of new/existing tweets
         """
         new_tweets_count = 0
-        existing_tweets_count = 0
         errors = []
         
+        # Look up which tweets are already stored with one IN query
+        tweet_ids = [tweet.get("id") for tweet in tweets_data]
+        existing_ids = set()
+        if tweet_ids:
+            try:
+                query = self.supabase.table("twitter_activity")\
+                    .select("tweet_id")\
+                    .in_("tweet_id", tweet_ids)
+                existing = await asyncio.to_thread(query.execute)
+                existing_ids = {row["tweet_id"] for row in existing.data}
+            except Exception as e:
+                logger.error("❌ Error checking existing tweets: %s", e)
+                return {
+                    "new_tweets": 0,
+                    "existing_tweets": 0,
+                    "total_processed": len(tweets_data),
+                    "errors": [f"Error checking existing tweets: {str(e)}"]
+                }
+        
+        collected_at = datetime.utcnow().isoformat()
+        tweet_records = []
         for tweet in tweets_data:
+            tweet_id = tweet.get("id")
+            if tweet_id in existing_ids:
+                continue
+            # Also skips a tweet repeated within this batch
+            existing_ids.add(tweet_id)
+            
             try:
-                tweet_id = tweet.get("id")
                 tweet_text = tweet.get("text", "")
-                created_at = tweet.get("created_at")
                 
                 # Get public metrics
                 metrics = tweet.get("public_metrics", {})
-                likes_count = metrics.get("like_count", 0)
-                retweets_count = metrics.get("retweet_count", 0)
-                replies_count = metrics.get("reply_count", 0)
-                
-                # Extract hashtags and mentions
-                hashtags = self.extract_hashtags(tweet_text)
-                mentions = self.extract_mentions(tweet_text)
-                
-                # Check if tweet already exists
-                existing = self.supabase.table("twitter_activity")\
-                    .select("id")\
-                    .eq("tweet_id", tweet_id)\
-                    .execute()
-                
-                if existing.data:
-                    existing_tweets_count += 1
-                    continue
                 
-                # Insert new tweet
-                tweet_record = {
+                tweet_records.append({
                     "user_id": user_id,
                     "tweet_id": tweet_id,
                     "tweet_text": tweet_text,
-                    "posted_at": created_at,
-                    "likes_count": likes_count,
-                    "retweets_count": retweets_count,
-                    "replies_count": replies_count,
-                    "hashtags_used": hashtags,
-                    "mentions_used": mentions,
+                    "posted_at": tweet.get("created_at"),
+                    "likes_count": metrics.get("like_count", 0),
+                    "retweets_count": metrics.get("retweet_count", 0),
+                    "replies_count": metrics.get("reply_count", 0),
+                    "hashtags_used": self.extract_hashtags(tweet_text),
+                    "mentions_used": self.extract_mentions(tweet_text),
                     "raw_data": tweet,
-                    "collected_at": datetime.utcnow().isoformat()
-                }
-                
-                self.supabase.table("twitter_activity")\
-                    .insert(tweet_record)\
-                    .execute()
-                
-                new_tweets_count += 1
-                
+                    "collected_at": collected_at
+                })
+            except Exception as e:
+                errors.append(f"Error saving tweet {tweet_id}: {str(e)}")
+                logger.error("❌ Error saving tweet: %s", e)
+        
+        existing_tweets_count = len(tweets_data) - len(tweet_records) - len(errors)
+        
+        # Insert all new tweets in one request
+        if tweet_records:
+            try:
+                query = self.supabase.table("twitter_activity")\
+                    .insert(tweet_records)
+                await asyncio.to_thread(query.execute)
+                new_tweets_count = len(tweet_records)
             except Exception as e:
-                errors.append(f"Error saving tweet {tweet.get('id')}: {str(e)}")
-                print(f"❌ Error saving tweet: {e}")
+                errors.append(f"Error saving {len(tweet_records)} tweets: {str(e)}")
+                logger.error("❌ Error saving tweets: %s", e)
         
         return {
             "new_tweets": new_tweets_count,
@@ -131,16 +147,17 @@ class TwitterDataService:
             list: List of tweet records ordered by posted_at DESC
         """
         try:
-            response = self.supabase.table("twitter_activity")\
+            query = self.supabase.table("twitter_activity")\
                 .select("*")\
                 .eq("user_id", user_id)\
                 .order("posted_at", desc=True)\
-                .limit(limit)\
-                .execute()
+                .limit(limit)
+            # Supabase client is sync; run the request in a thread so callers can gather
+            response = await asyncio.to_thread(query.execute)
             
             return response.data
         except Exception as e:
-            print(f"❌ Error fetching tweets from DB: {e}")
+            logger.error("❌ Error fetching tweets from DB: %s", e)
             return []
     
     async def update_twitter_fetch_log(
@@ -164,10 +181,10 @@ class TwitterDataService:
         """
         try:
             # Check if log exists for user
-            existing = self.supabase.table("twitter_data_fetch_log")\
+            query = self.supabase.table("twitter_data_fetch_log")\
                 .select("*")\
-                .eq("user_id", user_id)\
-                .execute()
+                .eq("user_id", user_id)
+            existing = await asyncio.to_thread(query.execute)
             
             log_data = {
                 "user_id": user_id,
@@ -180,20 +197,19 @@ class TwitterDataService:
             
             if existing.data:
                 # Update existing log
-                response = self.supabase.table("twitter_data_fetch_log")\
+                query = self.supabase.table("twitter_data_fetch_log")\
                     .update(log_data)\
-                    .eq("user_id", user_id)\
-                    .execute()
+                    .eq("user_id", user_id)
             else:
                 # Create new log
-                response = self.supabase.table("twitter_data_fetch_log")\
-                    .insert(log_data)\
-                    .execute()
+                query = self.supabase.table("twitter_data_fetch_log")\
+                    .insert(log_data)
+            response = await asyncio.to_thread(query.execute)
             
             return response.data[0] if response.data else {}
             
         except Exception as e:
-            print(f"❌ Error updating fetch log: {e}")
+            logger.error("❌ Error updating fetch log: %s", e)
             return {}
     
     async def get_fetch_log(self, user_id: str) -> Optional[Dict]:
@@ -207,14 +223,14 @@ class TwitterDataService:
             dict: Fetch log record or None
         """
         try:
-            response = self.supabase.table("twitter_data_fetch_log")\
+            query = self.supabase.table("twitter_data_fetch_log")\
                 .select("*")\
-                .eq("user_id", user_id)\
-                .execute()
+                .eq("user_id", user_id)
+            response = await asyncio.to_thread(query.execute)
             
             return response.data[0] if response.data else None
         except Exception as e:
-            print(f"❌ Error getting fetch log: {e}")
+            logger.error("❌ Error getting fetch log: %s", e)
             return None
     
     async def get_tweet_stats(self, user_id: str) -> Dict:
@@ -260,7 +276,7 @@ class TwitterDataService:
                 "most_recent_tweet": tweets[0].get("posted_at") if tweets else None
             }
         except Exception as e:
-            print(f"❌ Error calculating tweet stats: {e}")
+            logger.error("❌ Error calculating tweet stats: %s", e)
             return {}
 
 
@@ -1,6 +1,9 @@
 import os
 import tweepy
 from typing import Optional, Dict
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class TwitterService:
@@ -78,11 +81,11 @@ class TwitterService:
             }
         
         except tweepy.TweepyException as e:
-            print(f"Twitter API error: {str(e)}")
+            logger.error("Twitter API error: %s", e)
             raise Exception(f"Failed to post tweet: {str(e)}")
         
         except Exception as e:
-            print(f"Error posting tweet: {str(e)}")
+            logger.error("Error posting tweet: %s", e)
             raise Exception(f"Failed to post tweet: {str(e)}")
 
 
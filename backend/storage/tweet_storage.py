@@ -3,6 +3,9 @@ import os
 from typing import List, Dict
 from datetime import datetime
 import uuid
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class TweetStorage:
@@ -53,7 +56,7 @@ class TweetStorage:
             self._write_tweets(tweets)
         
         except Exception as e:
-            print(f"Error saving tweet: {str(e)}")
+            logger.error(f"Error saving tweet: {str(e)}")
             raise Exception(f"Failed to save tweet: {str(e)}")
     
     def get_history(self, limit: int = 50) -> List[Dict]:
@@ -71,7 +74,7 @@ class TweetStorage:
             return tweets[:limit]
         
         except Exception as e:
-            print(f"Error getting history: {str(e)}")
+            logger.error(f"Error getting history: {str(e)}")
             return []
     
     def _read_tweets(self) -> List[Dict]:
@@ -83,7 +86,7 @@ class TweetStorage:
             # If file is corrupted, return empty list
             return []
         except Exception as e:
-            print(f"Error reading tweets: {str(e)}")
+            logger.error(f"Error reading tweets: {str(e)}")
             return []
     
     def _write_tweets(self, tweets: List[Dict]) -> None: